@@ -1,35 +1,158 @@
-import threading
 import subprocess
 import tkinter as tk
 # Import common Tk widgets used throughout the UI
-from tkinter import ttk, filedialog
+from tkinter import ttk
 import os
-import uuid
+import re
+import threading
 import traceback
+from typing import Optional
 
 # Import helpers from the modular utils package so unrelated changes touch
 # fewer files and reduce merge conflicts.
 from utils.text import sanitize
-from utils.api import verify_api_key
+from utils.api import verify_api_key_cached
 from utils.config import (
     load_working_dir,
     save_working_dir,
     load_usage_days,
+    load_output_max_lines,
+    load_output_wrap,
     build_and_launch_game,
 )
-from utils.git import format_history_row, HISTORY_COL_WIDTHS, history_records_to_tsv
+from utils.git import (
+    format_history_row,
+    HISTORY_COL_WIDTHS,
+    history_records_to_tsv,
+    load_history_records,
+    HISTORY_PATH,
+)
 
 from nolight import runner
 
-# Map human-friendly names to actual model identifiers
-MODEL_OPTIONS = {
-    "High": "gpt-5",
-    "Medium": "gpt-5-mini",
-    "Low": "gpt-5-nano",
-}
+# Human-friendly model names shown in the dropdown and the model identifiers
+# they map to, in matching order. Keeping them as parallel tuples lets the send
+# handler look up the model by the dropdown's selected index.
+MODEL_LABELS = ("High", "Medium", "Low")
+MODEL_IDS = ("gpt-5", "gpt-5-mini", "gpt-5-nano")
 
 DEFAULT_CHOICE = "Medium"
 
+# History table columns as ``(name, heading, width, anchor)``, in the order of
+# ``format_history_row``. IDs and counts stay narrow while text fields get extra
+# room, and numbers line up on the right.
+HISTORY_COLUMNS = tuple(
+    (
+        col,
+        col.replace("_", " ").title(),
+        width,
+        "e" if col in {"lines", "files", "cost"} else "w",
+    )
+    for col, width in HISTORY_COL_WIDTHS.items()
+)
+
+# Rows added to the history table at a time. Further pages load as the user
+# scrolls toward the end of what is already shown.
+HISTORY_PAGE_ROWS = 200
+# Fraction of the loaded rows scrolled past before the next page is added
+HISTORY_LOAD_AT = 0.9
+
+# Keys that only move the cursor or selection, so they stay usable in the
+# read-only output box.
+READ_ONLY_NAV_KEYS = {"Left", "Right", "Up", "Down", "Home", "End", "Prior", "Next"}
+# Ctrl shortcuts that don't modify text: copy and select all.
+READ_ONLY_CTRL_KEYS = {"c", "a"}
+CONTROL_MASK = 0x4  # Tk's modifier bit for the Control key
+
+
+def block_edit_key(event) -> Optional[str]:
+    """Swallow key presses that would edit a read-only text widget."""
+    if event.keysym in READ_ONLY_NAV_KEYS:
+        return None
+    if event.state & CONTROL_MASK and event.keysym.lower() in READ_ONLY_CTRL_KEYS:
+        return None
+    # Returning "break" stops Tk's default Text bindings from inserting text.
+    return "break"
+
+
+def make_read_only(text_widget: tk.Text) -> None:
+    """Stop the user editing ``text_widget`` while leaving it in normal state.
+
+    Keeping the widget in ``normal`` state means code can insert into it
+    without toggling ``state`` around every write, and selecting or copying
+    text still works.
+    """
+    text_widget.bind("<Key>", block_edit_key)
+    # Edits that don't come from a key press of their own. ``<<PasteSelection>>``
+    # is the middle-click paste on X11.
+    for sequence in ("<<Paste>>", "<<Cut>>", "<<Clear>>", "<<PasteSelection>>"):
+        text_widget.bind(sequence, lambda _e: "break")
+    # Skip the box when tabbing between inputs; clicking still focuses it so
+    # text can be selected and copied.
+    text_widget.configure(takefocus=0)
+
+
+# Characters Tcl would treat as syntax inside a command word. Each is escaped
+# with a backslash; the control characters get their named escapes because a
+# backslash before a real newline means "continue the line" in Tcl. NUL is
+# escaped too, since ``tk.eval`` refuses a script containing a raw one.
+_TCL_SPECIAL_RE = re.compile(r'[\\\[\]{}"$;\s\x00]')
+_TCL_ESCAPES = {"\n": "\\n", "\t": "\\t", "\r": "\\r", "\x00": "\\x00"}
+
+
+def _tcl_quote(value) -> str:
+    """Return ``value`` as one Tcl word that evaluates back to ``str(value)``."""
+    text = str(value)
+    if not text:
+        return "{}"
+    return _TCL_SPECIAL_RE.sub(
+        lambda m: _TCL_ESCAPES.get(m.group(), "\\" + m.group()), text
+    )
+
+
+def insert_tree_rows(tree: ttk.Treeview, first_idx: int, rows: list) -> None:
+    """Append ``rows`` to ``tree`` with ids counting up from ``first_idx``.
+
+    All rows go to Tcl in one script instead of one ``tree.insert`` call each,
+    so a page of history costs a single trip into the interpreter.
+    """
+    if not rows:
+        return
+    script = "\n".join(
+        f"{tree} insert {{}} end -id {first_idx + n} "
+        f"-values [list {' '.join(_tcl_quote(v) for v in values)}]"
+        for n, values in enumerate(rows)
+    )
+    tree.tk.eval(script)
+
+
+def on_api_label_click(api_link: dict, open_settings, event=None) -> None:
+    """Call ``open_settings`` only while ``api_link`` marks the label as a link."""
+    if api_link["clickable"]:
+        open_settings(event)
+
+
+def load_history_page(history: dict, records: list) -> None:
+    """Insert the next page of ``records`` not yet shown in ``history["tree"]``.
+
+    ``history["rows"]`` caches the formatted rows of ``history["records"]``.
+    When the history list is replaced or shrinks, the cache and the table no
+    longer line up with it, so both start over.
+    """
+    tree = history["tree"]
+    rows = history["rows"]
+    if history["records"] is not records or len(records) < len(rows):
+        rows.clear()
+        tree.delete(*tree.get_children())
+        history["shown"] = 0
+        history["records"] = records
+    start = history["shown"]
+    stop = min(len(records), start + HISTORY_PAGE_ROWS)
+    rows.extend(format_history_row(rec) for rec in records[len(rows):stop])
+    # Each row's item id is its index so we can map back to the record later.
+    insert_tree_rows(tree, start, rows[start:stop])
+    history["shown"] = stop
+
 
 def show_build_error(msg: str) -> None:
     """Show a scrollable dialog containing the build failure ``msg``."""
@@ -98,6 +221,10 @@ def build_ui(root: tk.Tk):
 
     def choose_dir() -> None:
         """Prompt the user for a working directory and remember it."""
+        # Imported on first use: the dialog modules take a few milliseconds to
+        # load and most sessions reuse the cached directory instead.
+        from tkinter import filedialog
+
         path = filedialog.askdirectory()
         if path:
             work_dir_var.set(path)
@@ -130,7 +257,7 @@ def build_ui(root: tk.Tk):
     model_combo = ttk.Combobox(
         main_frame,
         textvariable=model_var,
-        values=list(MODEL_OPTIONS.keys()),
+        values=MODEL_LABELS,
         state="readonly",
         width=10,
     )
@@ -167,13 +294,22 @@ def build_ui(root: tk.Tk):
 
     def on_send(event=None) -> None:
         """Handle the Enter key by sending the message to aider."""
-        raw = txt_input.get("1.0", tk.END)
-        if not raw.strip():
+        # "end-1c" leaves out the newline Tk always keeps after the last line,
+        # so an empty box ends where it starts. Checking that first skips
+        # copying the text out of Tk when there's nothing to send.
+        if txt_input.compare("end-1c", "==", "1.0"):
+            return
+        raw = txt_input.get("1.0", "end-1c")
+        # ``isspace`` checks for a blank prompt without building a stripped copy
+        if raw.isspace():
             return
-        if not work_dir_var.get():
-            output.configure(state="normal")
-            output.insert(tk.END, "[error] Select a working directory first\n")
-            output.configure(state="disabled")
+        # Read the Tk variable once; each ``get`` is a round trip into Tcl.
+        work_dir = work_dir_var.get()
+        if not work_dir:
+            # Same path as streamed output, so the view follows and the cap applies
+            runner.append_output(
+                output, "[error] Select a working directory first\n", output_max_lines
+            )
             return
         msg = sanitize(raw)
         # Remove old output if the last request finished with a commit.
@@ -184,28 +320,32 @@ def build_ui(root: tk.Tk):
         txt_input.config(state="disabled")
         # Generate a new request id only if we're starting a fresh request.
         if not runner.request_active:
-            runner.current_request_id = str(uuid.uuid4())
+            # Imported here rather than at startup since it's only needed
+            # once a prompt is sent; later imports are a dict lookup.
+            import uuid
+
+            # ``hex`` skips formatting the dashed form; the history table only
+            # shows the first 8 characters either way.
+            runner.current_request_id = uuid.uuid4().hex
             runner.request_active = True
         req_id = runner.current_request_id
 
-        model = MODEL_OPTIONS[model_var.get()]
-        # Spawn a thread to call the runner so the UI stays responsive.
-        t = threading.Thread(
-            target=runner.run_aider,
-            args=(
-                msg,
-                output,
-                txt_input,
-                work_dir_var.get(),
-                model,
-                status_var,
-                status_label,
-                req_id,
-                session_cost_var,
-            ),
-            daemon=True,
+        # The dropdown is read-only, so its index always points into MODEL_IDS
+        model = MODEL_IDS[model_combo.current()]
+        # Hand the request to the runner's background worker so the UI stays
+        # responsive while aider runs.
+        runner.submit_request(
+            msg,
+            output,
+            txt_input,
+            work_dir,
+            model,
+            status_var,
+            status_label,
+            req_id,
+            session_cost_var,
+            output_max_lines,
         )
-        t.start()
 
     def on_return(event):
         on_send()
@@ -230,40 +370,67 @@ def build_ui(root: tk.Tk):
     # Expand label to fill the frame horizontally.
     status_label.pack(fill="x", padx=2, pady=2)
 
-    # Output area where aider output is streamed back to the user
-    output = tk.Text(response_frame, wrap="word", state="disabled")
+    # Output area where aider output is streamed back to the user.
+    # Aider prints one event per line, so by default the box doesn't wrap and
+    # long lines scroll sideways; Tk then only lays out the lines that are
+    # added rather than re-wrapping the transcript. ``[ui] output_wrap`` in
+    # config.ini turns wrapping back on.
+    output = tk.Text(response_frame, wrap=load_output_wrap())
+    # Read-only through key bindings rather than ``state`` so streamed output
+    # can be inserted without unlocking and relocking the widget each batch.
+    make_read_only(output)
+    # Line cap for the box, handed to the runner with every write to it
+    output_max_lines = load_output_max_lines()
     output_scroll = ttk.Scrollbar(response_frame, orient="vertical", command=output.yview)
-    output.configure(yscrollcommand=output_scroll.set)
+    output_xscroll = ttk.Scrollbar(response_frame, orient="horizontal", command=output.xview)
+    output.configure(yscrollcommand=output_scroll.set, xscrollcommand=output_xscroll.set)
     output.grid(row=1, column=0, sticky="nsew")
     output_scroll.grid(row=1, column=1, sticky="ns")
+    output_xscroll.grid(row=2, column=0, sticky="ew")
     response_frame.rowconfigure(1, weight=1)
     response_frame.columnconfigure(0, weight=1)
 
     # Give the response area more room than the input by default
     paned.add(response_frame, weight=3)
 
-    def show_history() -> None:
-        """Open a window displaying a table of previous requests."""
+    # The history window is built once and only hidden when closed. Rows are
+    # inserted a page at a time as the user scrolls, so opening a long history
+    # only pays for the rows near the top, and reopening only adds what's new.
+    # ``rows`` keeps the formatted values of each record in ``records``;
+    # records never change once saved, so they are formatted once even across
+    # closing the window.
+    history = {
+        "win": None,
+        "tree": None,
+        "scroll": None,
+        "shown": 0,
+        "rows": [],
+        "records": None,
+    }
+
+    def close_history() -> None:
+        """Hide the history window, keeping its rows for the next open."""
+        history["win"].withdraw()
+
+    def on_history_scroll(first: str, last: str) -> None:
+        """Update the scrollbar and load more rows near the end of the table."""
+        history["scroll"].set(first, last)
+        # Tk also calls this after inserts, so a page too short to fill the
+        # window pulls in the next one until the view is full.
+        if float(last) >= HISTORY_LOAD_AT:
+            load_history_page(history, runner.request_history)
+
+    def build_history_window() -> None:
+        """Create the history window and its empty table."""
         win = tk.Toplevel(root)
         win.title("History")
-        cols = (
-            "request_id",
-            "commit_id",
-            "lines",
-            "files",
-            "cost",
-            "failure_reason",
-            "description",
+        win.protocol("WM_DELETE_WINDOW", close_history)
+        tree = ttk.Treeview(
+            win, columns=[col for col, *_ in HISTORY_COLUMNS], show="headings"
         )
-        tree = ttk.Treeview(win, columns=cols, show="headings")
-        for col in cols:
-            tree.heading(col, text=col.replace("_", " ").title())
-            # Keep IDs and counts narrow but give text fields extra room.
-            anchor = "e" if col in {"lines", "files", "cost"} else "w"
-            tree.column(col, width=HISTORY_COL_WIDTHS[col], anchor=anchor)
-        for idx, rec in enumerate(runner.request_history):
-            # Use ``idx`` as the item id so we can map back to the record later.
-            tree.insert("", tk.END, iid=str(idx), values=format_history_row(rec))
+        for col, heading, width, anchor in HISTORY_COLUMNS:
+            tree.heading(col, text=heading)
+            tree.column(col, width=width, anchor=anchor)
 
         def copy_selected(event=None) -> None:
             """Copy selected history rows to the clipboard."""
@@ -280,7 +447,21 @@ def build_ui(root: tk.Tk):
 
         # Allow standard Ctrl+C copying of the selected rows.
         tree.bind("<Control-c>", copy_selected)
+        scroll = ttk.Scrollbar(win, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=on_history_scroll)
+        scroll.pack(side="right", fill="y")
         tree.pack(fill="both", expand=True)
+        history.update(win=win, tree=tree, scroll=scroll, shown=0)
+
+    def show_history() -> None:
+        """Open (or raise) the window displaying a table of previous requests."""
+        win = history["win"]
+        if win is None or not win.winfo_exists():
+            build_history_window()
+        else:
+            win.deiconify()
+            win.lift()
+        load_history_page(history, runner.request_history)
 
     # Simple button to pop up the history table
     history_btn = ttk.Button(main_frame, text="History", command=show_history)
@@ -295,6 +476,16 @@ def build_ui(root: tk.Tk):
         if os.name == "nt":
             subprocess.Popen(["rundll32.exe", "sysdm.cpl,EditEnvironmentVariables"])
 
+    # The API label only acts as a link while the key is missing. It is bound
+    # once and the handler checks this flag, so status changes don't have to
+    # rebind or unbind the click event.
+    api_link = {"clickable": False}
+
+    api_status_label.bind(
+        "<Button-1>",
+        lambda event: on_api_label_click(api_link, open_env_settings, event),
+    )
+
     def check_api_key() -> None:
         """Validate the OPENAI_API_KEY and report the result to the user."""
         api_key = os.environ.get("OPENAI_API_KEY")
@@ -305,26 +496,49 @@ def build_ui(root: tk.Tk):
                 foreground="red",
                 cursor="hand2",
             )
-            api_status_label.bind("<Button-1>", open_env_settings)
+            api_link["clickable"] = True
             txt_input.config(state="disabled")
             return
 
-        try:
-            verify_api_key(api_key)
-            api_status_label.config(
-                text="✓ OpenAI API key verified",
-                foreground="green",
-                cursor="",
-            )
-            api_status_label.unbind("<Button-1>")
-            txt_input.config(state="normal")
-        except Exception as e:
-            # Show the failure reason from verify_api_key so the user can fix it
-            api_status_label.config(
-                text=f"API key: ✗ ({e})", foreground="red", cursor=""
-            )
-            api_status_label.unbind("<Button-1>")
-            txt_input.config(state="disabled")
+        def show_result(error: Optional[Exception]) -> None:
+            """Report the outcome of the key check; runs on the Tk thread."""
+            if error is None:
+                api_status_label.config(
+                    text="✓ OpenAI API key verified",
+                    foreground="green",
+                    cursor="",
+                )
+                # A request that is still running unlocks the box itself when
+                # it finishes; unlocking now would allow a second prompt.
+                if not runner.request_active:
+                    txt_input.config(state="normal")
+            else:
+                # Show the failure reason from verify_api_key so the user can fix it
+                api_status_label.config(
+                    text=f"API key: ✗ ({error})", foreground="red", cursor=""
+                )
+                txt_input.config(state="disabled")
+
+        def verify_in_background() -> None:
+            """Call the API off the Tk thread so the window stays responsive."""
+            try:
+                # Repeat checks with the same key within a few minutes reuse the
+                # last successful result instead of calling the API again.
+                verify_api_key_cached(api_key)
+                error = None
+            except Exception as e:
+                error = e
+            # Tk is not thread-safe, even ``after`` must not be called from
+            # here, so queue the result for the UI pump to apply.
+            runner.post(show_result, error)
+
+        api_link["clickable"] = False
+        api_status_label.config(
+            text="API key: checking...", foreground="orange", cursor=""
+        )
+        # No prompts until the key is known to work.
+        txt_input.config(state="disabled")
+        threading.Thread(target=verify_in_background, daemon=True).start()
 
     widgets = {
         "model_label": model_label,
@@ -334,6 +548,13 @@ def build_ui(root: tk.Tk):
         "txt_input": txt_input,
         # Expose the working directory variable for test configuration.
         "work_dir_var": work_dir_var,
+        # Lets tests open the history window the same way the user does.
+        "history_btn": history_btn,
+        # Lets tests read the API key status text.
+        "api_status_label": api_status_label,
+        # Lets tests check how the output box is configured.
+        "output": output,
+        "output_xscroll": output_xscroll,
     }
 
     return widgets, check_api_key
@@ -344,7 +565,12 @@ def main() -> None:
 
     root = tk.Tk()
     root.title("Aider Prompt UI")
+    # Bring back history from earlier runs and keep appending new requests.
+    runner.request_history.extend(load_history_records(HISTORY_PATH))
+    runner.history_path = HISTORY_PATH
     _, check_api = build_ui(root)
+    # Start applying widget updates posted by the background worker.
+    runner.pump_ui(root)
     root.after(0, check_api)
     root.mainloop()
 
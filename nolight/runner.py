@@ -1,13 +1,25 @@
+import codecs
+import queue
 import subprocess
-from typing import Optional, List
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Iterator, Optional, List
 
 import tkinter as tk
 from tkinter import ttk
 
 # Import helpers from the modular utils package so contributors can edit
 # specific areas without touching a monolithic file.
-from utils.text import should_suppress, needs_user_input, extract_cost, strip_ansi
-from utils.git import extract_commit_id, get_commit_stats
+from utils.text import (
+    should_suppress,
+    has_line_markers,
+    needs_user_input,
+    extract_cost,
+    strip_ansi,
+)
+from utils.git import extract_commit_id, get_commit_stats, append_history_record
 
 # Track details for each user request so they can be shown in a history table.
 request_history: List[dict] = []  # List of per-request summaries
@@ -17,6 +29,125 @@ request_active = False  # True while we're waiting on aider to finish
 reset_on_new_request = False
 # Total dollars spent during this application session
 session_total_cost: float = 0.0
+# When set, every new history record is also appended to this JSONL file so
+# the history survives restarts. The app sets it at startup; tests leave it
+# unset so they never touch the real file.
+history_path: Optional[Path] = None
+
+# Requests waiting for the background worker. Each item is the argument tuple
+# for ``run_aider``; runs execute one at a time, matching the UI, which locks
+# the input box while a request is in flight.
+job_queue: "queue.Queue[tuple]" = queue.Queue()
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+
+# Pipes waiting for a reader thread, as ``(stream, lines)`` pairs. Reader
+# threads outlive each run and are reused, so a request doesn't start a new
+# OS thread just to read aider's output. ``_idle_readers`` counts readers that
+# are free for the next pipe.
+_read_jobs: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+_idle_readers = 0
+_reader_lock = threading.Lock()
+
+# Widget updates produced off the Tk thread. Each item is a ``(func, args)``
+# pair; ``pump_ui`` runs them on the Tk thread, in the order they were posted,
+# so background code never calls into Tcl itself. Nothing joins on it, so the
+# lighter ``SimpleQueue`` (no task tracking or extra locks) is enough.
+ui_queue: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+UI_PUMP_INTERVAL_MS = 30  # How often the Tk thread drains ``ui_queue``
+UI_PUMP_MAX_ITEMS = 200  # Cap per tick so a flood of updates can't freeze the UI
+
+# Streamed output is handed to the Tk thread after this many lines or seconds,
+# whichever comes first, so the widget sees one insert per batch.
+FLUSH_MAX_LINES = 64
+FLUSH_INTERVAL = 0.05
+
+# The output box keeps at most this many lines. Once past the cap the oldest
+# lines are dropped in one delete, leaving ``OUTPUT_TRIM_LINES`` of headroom so
+# trimming happens once per few thousand lines rather than on every insert.
+# This is only the default; the app passes ``[ui] output_max_lines`` from
+# config.ini to ``run_aider`` and ``append_output``.
+OUTPUT_MAX_LINES = 10000
+OUTPUT_TRIM_LINES = 2000
+# First line of the box after a trim, so the missing start isn't a mystery.
+# The next trim deletes it along with the old lines and puts a fresh one back.
+OUTPUT_TRIM_NOTICE = "[older output trimmed]\n"
+
+# Fixed leading arguments for every aider run. Automatically answer "yes" and
+# always include project instructions so aider sees AGENTS.md and README.md on
+# every request; ``run_aider`` appends the model and message.
+AIDER_BASE_ARGS = ("aider", "AGENTS.md", "README.md", "--yes-always", "--model")
+
+# Bytes requested per read from aider's pipe. Reading in large chunks and
+# decoding them in bulk avoids a syscall and a decode call for every line.
+READ_CHUNK_SIZE = 65536
+
+# Rule printed under a failed request so separate attempts are easy to tell apart
+OUTPUT_SEPARATOR = "-" * 60 + "\n"
+
+
+def submit_request(*args) -> None:
+    """Queue a ``run_aider`` call for the shared background worker thread.
+
+    Reusing one long-lived thread avoids starting a new OS thread for every
+    prompt. The worker is started lazily on the first submission.
+    """
+
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_process_jobs, daemon=True)
+            _worker.start()
+    job_queue.put(args)
+
+
+def _process_jobs() -> None:
+    """Run queued requests one after another for the life of the app."""
+    while True:
+        args = job_queue.get()
+        try:
+            # Resolve run_aider at call time so tests can swap it out.
+            run_aider(*args)
+        except Exception:
+            # One crashing request must not kill the worker and stall every
+            # request after it, so report the error and keep going.
+            traceback.print_exc()
+        finally:
+            job_queue.task_done()
+
+
+def post(func: Callable, *args) -> None:
+    """Queue ``func(*args)`` to run on the Tk thread; safe from any thread."""
+    ui_queue.put((func, args))
+
+
+def drain_ui_queue(max_items: Optional[int] = None) -> int:
+    """Run queued widget updates on the calling (Tk) thread.
+
+    Returns how many updates ran. ``max_items`` bounds the work done in one
+    call; ``None`` drains everything currently queued.
+    """
+
+    done = 0
+    while max_items is None or done < max_items:
+        try:
+            func, args = ui_queue.get_nowait()
+        except queue.Empty:
+            break
+        done += 1
+        try:
+            func(*args)
+        except Exception:
+            # A failing update (e.g. a widget destroyed mid-request) must not
+            # stop the updates queued behind it.
+            traceback.print_exc()
+    return done
+
+
+def pump_ui(root) -> None:
+    """Drain ``ui_queue`` now and again every ``UI_PUMP_INTERVAL_MS``."""
+    drain_ui_queue(UI_PUMP_MAX_ITEMS)
+    root.after(UI_PUMP_INTERVAL_MS, pump_ui, root)
 
 
 def update_status(status_var, status_label, message: str, color: str = "black") -> None:
@@ -27,6 +158,18 @@ def update_status(status_var, status_label, message: str, color: str = "black")
     status_label.config(foreground=color)
 
 
+def reset_status_link(status_label) -> None:
+    """Remove any click handler and hand cursor left on the status label."""
+    status_label.config(cursor="")
+    status_label.unbind("<Button-1>")
+
+
+def unlock_input(txt_input) -> None:
+    """Re-enable the prompt box and give it focus for the next message."""
+    txt_input.config(state="normal")
+    txt_input.focus_set()
+
+
 def record_request(
     request_id: str,
     commit_id: Optional[str],
@@ -66,17 +209,209 @@ def record_request(
         description = stats.get("description", description)
 
     # Store all relevant details so the UI can present them to the user later.
-    request_history.append(
-        {
-            "request_id": request_id,
-            "commit_id": commit_id,
-            "lines": lines_total,
-            "files": files_total,
-            "cost": cost,
-            "failure_reason": failure_reason,
-            "description": description,
-        }
-    )
+    record = {
+        "request_id": request_id,
+        "commit_id": commit_id,
+        "lines": lines_total,
+        "files": files_total,
+        "cost": cost,
+        "failure_reason": failure_reason,
+        "description": description,
+    }
+    request_history.append(record)
+    if history_path is not None:
+        try:
+            append_history_record(record, history_path)
+        except OSError:
+            # Failing to save history must not fail the request itself.
+            traceback.print_exc()
+
+
+def append_output(
+    output_widget: tk.Text, text: str, max_lines: Optional[int] = None
+) -> None:
+    """Append ``text`` to the read-only output box.
+
+    The view follows new output only while the user is already at the bottom,
+    so scrolling up to read earlier output isn't undone by the next batch.
+    The box is trimmed once it passes ``max_lines`` (``OUTPUT_MAX_LINES`` if
+    not given).
+    """
+    if max_lines is None:
+        max_lines = OUTPUT_MAX_LINES
+    # ``yview`` reports the visible fraction; an end of 1.0 means the last line
+    # is on screen. Check before inserting, since the insert moves the end.
+    at_bottom = output_widget.yview()[1] >= 1.0
+    # The box is read-only through key bindings, so no state toggling is needed.
+    output_widget.insert(tk.END, text)
+    # Tk stores the whole transcript, so cap its length to keep inserts cheap
+    # and memory bounded over long sessions.
+    line_count = int(output_widget.index("end-1c").split(".")[0])
+    if line_count > max_lines:
+        # A small configured cap shrinks the headroom so a trim never empties
+        # the whole box.
+        headroom = min(OUTPUT_TRIM_LINES, max_lines // 5)
+        keep_from = line_count - max_lines + headroom + 1
+        output_widget.delete("1.0", f"{keep_from}.0")
+        output_widget.insert("1.0", OUTPUT_TRIM_NOTICE)
+    if at_bottom:
+        # Scroll only the vertical view. ``see`` would also scroll sideways to
+        # the start of the last line, undoing any horizontal scroll now that
+        # long lines aren't wrapped.
+        output_widget.yview_moveto(1.0)
+
+
+class OutputBuffer:
+    """Collect output text and pass it to the Tk thread in batches.
+
+    ``run_aider`` runs on a worker thread and may not touch widgets. Lines are
+    buffered on the worker and handed over in batches; a single queued drain
+    inserts everything handed over before the Tk thread gets to it, so however
+    fast aider prints, the widget sees at most one insert and scroll per pump tick.
+    """
+
+    def __init__(
+        self,
+        output_widget: tk.Text,
+        max_lines: int = FLUSH_MAX_LINES,
+        interval: float = FLUSH_INTERVAL,
+        output_max_lines: Optional[int] = None,
+    ) -> None:
+        self.output_widget = output_widget
+        self.max_lines = max_lines
+        self.interval = interval
+        # Line cap for the output box itself, passed on to ``append_output``
+        self.output_max_lines = output_max_lines
+        self._chunks: List[str] = []
+        # Work in integer nanoseconds so the per-line staleness check is one
+        # integer comparison with no float arithmetic.
+        self._interval_ns = int(interval * 1_000_000_000)
+        # Monotonic time after which pending text is considered stale. Storing
+        # the deadline keeps the per-line check to a single comparison.
+        self._deadline_ns = time.monotonic_ns() + self._interval_ns
+        # Text handed over to the Tk thread but not inserted yet. The lock is
+        # taken once per batch, not per line.
+        self._ready: List[str] = []
+        self._lock = threading.Lock()
+        # True while a drain is queued, so batches arriving in the meantime
+        # ride along with it instead of queueing their own.
+        self._drain_scheduled = False
+
+    def write(self, text: str) -> None:
+        """Queue ``text`` and flush if the batch is full or getting stale."""
+        self._chunks.append(text)
+        if len(self._chunks) >= self.max_lines or time.monotonic_ns() >= self._deadline_ns:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand everything written so far to the Tk thread."""
+        if self._chunks:
+            with self._lock:
+                self._ready.extend(self._chunks)
+                schedule = not self._drain_scheduled
+                self._drain_scheduled = True
+            self._chunks = []
+            if schedule:
+                post(self._drain)
+        self._deadline_ns = time.monotonic_ns() + self._interval_ns
+
+    def _drain(self) -> None:
+        """Insert all handed-over text in one call; runs on the Tk thread."""
+        with self._lock:
+            ready, self._ready = self._ready, []
+            self._drain_scheduled = False
+        if ready:
+            append_output(self.output_widget, "".join(ready), self.output_max_lines)
+
+
+def _read_stream(stream, lines: "queue.SimpleQueue[Optional[str]]") -> None:
+    """Read ``stream`` to the end, putting each decoded line on ``lines``."""
+    # ``read1`` returns whatever the pipe has ready instead of waiting for a
+    # full chunk, so output still arrives promptly.
+    read = stream.read1
+    # The incremental decoder keeps multi-byte characters that straddle two
+    # reads intact instead of replacing both halves.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    partial = ""  # Text after the last line break, waiting for the rest
+    while True:
+        chunk = read(READ_CHUNK_SIZE)
+        final = not chunk
+        text = partial + decoder.decode(chunk, final)
+        # A trailing "\r" may be the first half of a "\r\n" pair, so
+        # keep it back until the next read shows what follows.
+        held = "\r" if not final and text.endswith("\r") else ""
+        if held:
+            text = text[:-1]
+        # Match text-mode pipes, which treat "\r\n" and "\r" as "\n".
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        *complete, partial = text.split("\n")
+        for line in complete:
+            lines.put(line + "\n")
+        partial += held
+        if final:
+            # Output that does not end in a newline is still a line.
+            if partial:
+                lines.put(partial)
+            break
+
+
+def _start_reader(stream, lines: "queue.SimpleQueue[Optional[str]]") -> None:
+    """Hand ``stream`` to a reader thread, reusing an idle one if there is one.
+
+    Runs are one at a time, so normally a single reader serves every request.
+    A new thread is only started when every reader is still busy, for example
+    with the pipe of a run that was abandoned before its output ended, so a
+    new run never waits behind a stuck read.
+    """
+    global _idle_readers
+    with _reader_lock:
+        if _idle_readers:
+            _idle_readers -= 1
+        else:
+            threading.Thread(target=_process_reads, daemon=True).start()
+    _read_jobs.put((stream, lines))
+
+
+def _process_reads() -> None:
+    """Read queued streams one after another for the life of the app."""
+    global _idle_readers
+    while True:
+        stream, lines = _read_jobs.get()
+        try:
+            _read_stream(stream, lines)
+        except Exception:
+            # A failed read ends its own stream, not the thread.
+            traceback.print_exc()
+        finally:
+            # Count this reader as free before ending the stream, so a run
+            # that starts right after this one finds it idle.
+            with _reader_lock:
+                _idle_readers += 1
+            # ``None`` marks the end of the stream, even if reading failed.
+            lines.put(None)
+
+
+def iter_lines(stream, on_idle: Callable[[], None], idle_timeout: float) -> Iterator[str]:
+    """Yield lines from ``stream``, calling ``on_idle`` whenever it goes quiet.
+
+    ``stream`` is a binary pipe. A reader thread reads it in chunks of up to
+    ``READ_CHUNK_SIZE`` bytes, decodes each chunk as UTF-8 and hands complete
+    lines over through a queue. Waiting on the queue with a timeout means the
+    caller regains control every ``idle_timeout`` seconds even while aider
+    prints nothing, so buffered output is not stuck behind a silent subprocess.
+    """
+
+    lines: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+    _start_reader(stream, lines)
+    while True:
+        try:
+            line = lines.get(timeout=idle_timeout)
+        except queue.Empty:
+            on_idle()
+            continue
+        if line is None:
+            return
+        yield line
 
 
 def maybe_clear_output(output_widget: tk.Text) -> None:
@@ -89,9 +424,7 @@ def maybe_clear_output(output_widget: tk.Text) -> None:
 
     global reset_on_new_request
     if reset_on_new_request and not request_active:
-        output_widget.configure(state="normal")
         output_widget.delete("1.0", tk.END)
-        output_widget.configure(state="disabled")
         reset_on_new_request = False
 
 
@@ -105,6 +438,7 @@ def run_aider(
     status_label: ttk.Label,
     request_id: str,
     session_cost_var: Optional[tk.StringVar] = None,
+    output_max_lines: Optional[int] = None,
 ) -> None:
     """Spawn the aider CLI and capture commit details.
 
@@ -114,41 +448,32 @@ def run_aider(
     """
 
     global request_active, reset_on_new_request, session_total_cost
+    # This function runs on a worker thread and Tk is not thread-safe, so every
+    # widget update goes through ``post`` for the Tk thread to apply.
     # Ensure the status bar is reset for each new request by removing any
     # previous click handlers and cursor styling.
-    status_label.config(cursor="")
-    status_label.unbind("<Button-1>")
+    post(reset_status_link, status_label)
+    # Every write to the output box goes through one buffer so batches stay in
+    # the order they were produced.
+    out = OutputBuffer(output_widget, output_max_lines=output_max_lines)
 
     try:
-        # Automatically answer "yes" and always include project instructions
-        # so aider sees AGENTS.md and README.md on every request.
-        cmd_args = [
-            "aider",
-            "AGENTS.md",
-            "README.md",
-            "--yes-always",
-            "--model",
-            model,
-            "--message",
-            msg,
-        ]
+        # Only the model and message change between requests.
+        cmd_args = [*AIDER_BASE_ARGS, model, "--message", msg]
 
         # Shorten the request id for compact status messages
         short_id = request_id[:8]
-        update_status(
+        post(
+            update_status,
             status_var,
             status_label,
             f"Request {short_id}: waiting on aider's response...",
             "black",
         )
 
-        output_widget.configure(state="normal")
-        output_widget.insert(
-            tk.END,
-            f"\n> aider AGENTS.md README.md --model {model} --message \"{msg}\"\n\n",
+        out.write(
+            f"\n> aider AGENTS.md README.md --model {model} --message \"{msg}\"\n\n"
         )
-        output_widget.see(tk.END)
-        output_widget.configure(state="disabled")
 
         # Stream output back into the widget (no TTY; filter noisy warnings).
         proc = subprocess.Popen(
@@ -156,10 +481,9 @@ def run_aider(
             cwd=work_dir,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            encoding="utf-8",
-            errors="replace",
+            # Binary pipe: ``iter_lines`` reads it in large chunks and decodes
+            # them itself rather than decoding one line at a time.
+            bufsize=READ_CHUNK_SIZE,
         )
 
         commit_id: Optional[str] = None
@@ -168,46 +492,61 @@ def run_aider(
         last_line = ""  # Remember the most recent non-empty line from aider
         request_cost = 0.0  # Dollars charged for this request
 
-        # Read line-by-line so the UI stays responsive.
-        for line in proc.stdout:
-            if should_suppress(line):
+        # The loop below can run for thousands of lines, so bind the per-line
+        # helpers to locals once instead of looking them up on every line.
+        write = out.write
+        suppress = should_suppress
+        decolor = strip_ansi
+        has_markers = has_line_markers
+        find_commit = extract_commit_id
+        find_cost = extract_cost
+        asks_user = needs_user_input
+
+        # Read line-by-line so the UI stays responsive. Pending output is
+        # flushed whenever aider goes quiet for a moment.
+        for line in iter_lines(proc.stdout, out.flush, out.interval):
+            if suppress(line):
                 continue
 
             # Remove ANSI color codes so the UI doesn't display strange characters
-            clean_line = strip_ansi(line)
+            clean_line = decolor(line)
 
             # Echo aider's response back to the text widget for the user to read
-            output_widget.configure(state="normal")
-            output_widget.insert(tk.END, clean_line)
-            output_widget.see(tk.END)
-            output_widget.configure(state="disabled")
+            write(clean_line)
 
             # Keep track of the latest meaningful line for error reporting
             clean = clean_line.strip()  # After stripping color codes, drop extra spaces
             if clean:  # Ignore lines that become empty once ANSI codes are stripped
                 last_line = clean
 
+            # Most lines are plain progress or diff text; one prefilter scan
+            # lets them skip the commit, cost and prompt checks below.
+            if not has_markers(clean_line):
+                continue
+
             # Try to extract a commit hash from the stream.
-            cid = extract_commit_id(clean_line)
+            cid = find_commit(clean_line)
             if cid:
                 commit_id = cid
 
             # Capture cost information when aider reports it
-            amt = extract_cost(clean_line)
+            amt = find_cost(clean_line)
             if amt is not None:
                 request_cost = amt
                 session_total_cost += amt
                 # Update the session cost label in the UI if provided
                 if session_cost_var is not None:
-                    session_cost_var.set(
-                        f"Total credits this session: ${session_total_cost:.4f}"
+                    post(
+                        session_cost_var.set,
+                        f"Total credits this session: ${session_total_cost:.4f}",
                     )
 
             # If aider is asking for more information, stop the process and let
             # the user reply instead of timing out.
-            if needs_user_input(clean_line):
+            if asks_user(clean_line):
                 waiting_on_user = True
-                update_status(
+                post(
+                    update_status,
                     status_var,
                     status_label,
                     # Tell the user exactly what to do next in the status bar
@@ -215,12 +554,9 @@ def run_aider(
                     "orange",
                 )
                 # Provide a hint in the output area so instructions aren't missed
-                output_widget.configure(state="normal")
-                output_widget.insert(
-                    tk.END,
-                    "[info] Aider needs more details. Add the requested files or answers above and press Enter.\n",
+                write(
+                    "[info] Aider needs more details. Add the requested files or answers above and press Enter.\n"
                 )
-                output_widget.configure(state="disabled")
                 proc.kill()
                 break
 
@@ -235,7 +571,8 @@ def run_aider(
                 # Query git for stats about the commit so we can store them.
                 stats = get_commit_stats(commit_id, work_dir)
                 record_request(request_id, commit_id, stats, cost=request_cost)
-                update_status(
+                post(
+                    update_status,
                     status_var,
                     status_label,
                     f"Request {short_id}: committed changes ({commit_id})",
@@ -249,7 +586,8 @@ def run_aider(
                     failure_reason=f"stats error: {e}",
                     cost=request_cost,
                 )
-                update_status(
+                post(
+                    update_status,
                     status_var,
                     status_label,
                     f"Request {short_id}: commit {commit_id} but stats failed",
@@ -269,12 +607,11 @@ def run_aider(
                 # Include exit code and last line so the user knows what happened
                 code = proc.returncode
                 failure_reason = f"aider exited with code {code}: {last_line}"
-            output_widget.configure(state="normal")
-            output_widget.insert(tk.END, f"\n[error] {failure_reason}\n")
-            output_widget.insert(tk.END, f"[exit code: {proc.returncode}]\n")
-            output_widget.insert(tk.END, "-" * 60 + "\n")
-            output_widget.configure(state="disabled")
-            update_status(
+            out.write(
+                f"\n[error] {failure_reason}\n[exit code: {proc.returncode}]\n{OUTPUT_SEPARATOR}"
+            )
+            post(
+                update_status,
                 status_var,
                 status_label,
                 f"Request {short_id}: failed - {failure_reason}",
@@ -284,13 +621,11 @@ def run_aider(
             record_request(request_id, None, failure_reason=failure_reason, cost=request_cost)
             request_active = False
     except FileNotFoundError:
-        output_widget.configure(state="normal")
-        output_widget.insert(
-            tk.END,
-            "\n[error] Could not find 'aider'. Make sure it's installed and on your PATH.\n",
+        out.write(
+            "\n[error] Could not find 'aider'. Make sure it's installed and on your PATH.\n"
         )
-        output_widget.configure(state="disabled")
-        update_status(
+        post(
+            update_status,
             status_var,
             status_label,
             "Failed to make commit due to missing 'aider'",
@@ -299,7 +634,8 @@ def run_aider(
         record_request(request_id, None, failure_reason="aider not found", cost=0.0)
         request_active = False
     finally:
+        # Push any remaining output to the widget before handing control back.
+        out.flush()
         # Re-enable the input box so the user can type a follow-up or new request.
-        txt_input.config(state="normal")
-        txt_input.focus_set()
+        post(unlock_input, txt_input)
 
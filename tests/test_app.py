@@ -163,7 +163,8 @@ def test_input_cleared_after_send(monkeypatch):
     def fake_run_aider(msg, output, txt, *_args, **_kwargs):
         """Short-circuit the runner so the test doesn't spawn aider."""
         app.runner.request_active = False
-        txt.config(state="normal")
+        # Runs on the worker thread, so widget updates go through the UI queue
+        app.runner.post(app.runner.unlock_input, txt)
 
     # Replace the real runner with our instant-return fake
     monkeypatch.setattr(app.runner, "run_aider", fake_run_aider)
@@ -171,8 +172,405 @@ def test_input_cleared_after_send(monkeypatch):
     txt_input.insert("1.0", "hello")
     txt_input.event_generate("<Return>")  # Trigger the send handler
     root.update()  # Process pending events so the handler runs
+    # Let the worker finish the job before the fake is unpatched, then apply
+    # its queued widget updates so nothing is left for later tests.
+    app.runner.job_queue.join()
+    app.runner.drain_ui_queue()
 
     # After sending, the input area should be empty and ready for new text
     assert txt_input.get("1.0", "end-1c") == ""
     root.destroy()
 
+
+def test_blank_prompt_or_missing_work_dir_not_sent(monkeypatch):
+    """Empty or whitespace prompts and a missing work dir never reach the runner."""
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        pytest.skip("Tkinter display not available")
+
+    submitted = []
+    monkeypatch.setattr(app.runner, "submit_request", lambda *a: submitted.append(a))
+    widgets, _ = app.build_ui(root)
+    txt_input = widgets["txt_input"]
+    work_var = widgets["work_dir_var"]
+
+    work_var.set("/tmp")
+    for prompt in ("", "  \n\t "):
+        txt_input.delete("1.0", "end")
+        txt_input.insert("1.0", prompt)
+        txt_input.event_generate("<Return>")
+        root.update()
+    assert submitted == []
+
+    # A real prompt without a working directory is refused with a message
+    work_var.set("")
+    txt_input.insert("1.0", "hello")
+    txt_input.event_generate("<Return>")
+    root.update()
+    assert submitted == []
+    assert "Select a working directory" in widgets["output"].get("1.0", "end")
+    root.destroy()
+
+
+def test_output_uses_configured_wrap_and_horizontal_scrollbar(monkeypatch):
+    """The output box takes its wrap mode from config and can scroll sideways."""
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        pytest.skip("Tkinter display not available")
+
+    for mode in ("word", "none"):
+        monkeypatch.setattr(app, "load_output_wrap", lambda mode=mode: mode)
+        widgets, _ = app.build_ui(root)
+        output = widgets["output"]
+        xscroll = widgets["output_xscroll"]
+        assert str(output.cget("wrap")) == mode
+        assert str(xscroll.cget("orient")) == "horizontal"
+        # The scrollbar sits under the text box and follows its sideways view
+        assert output.cget("xscrollcommand")
+        assert int(xscroll.grid_info()["row"]) == int(output.grid_info()["row"]) + 1
+    root.destroy()
+
+
+def test_block_edit_key_allows_navigation_and_copy():
+    """The read-only output box should still allow moving around and copying."""
+    from types import SimpleNamespace
+
+    def press(keysym, state=0):
+        return app.block_edit_key(SimpleNamespace(keysym=keysym, state=state))
+
+    # Cursor movement and copy/select-all fall through to Tk's own bindings
+    assert press("Down") is None
+    assert press("c", state=app.CONTROL_MASK) is None
+    assert press("a", state=app.CONTROL_MASK) is None
+    # Typing, deleting and pasting are swallowed
+    assert press("x") == "break"
+    assert press("BackSpace") == "break"
+    assert press("v", state=app.CONTROL_MASK) == "break"
+
+
+def test_check_api_key_runs_off_tk_thread(monkeypatch):
+    """Key verification should happen on a worker and report back via Tk."""
+    import threading
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        pytest.skip("Tkinter display not available")
+
+    threads = []
+
+    def fake_verify(_key):
+        # Remember where the network call ran
+        threads.append(threading.current_thread())
+        return True
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(app, "verify_api_key_cached", fake_verify)
+    monkeypatch.setattr(app.runner, "request_active", False)
+
+    widgets, check_api = app.build_ui(root)
+    check_api()
+    # Let the worker finish, then apply its queued result as the pump would
+    for _ in range(100):
+        app.runner.drain_ui_queue()
+        root.update()
+        if str(widgets["txt_input"].cget("state")) == "normal" and threads:
+            break
+        threading.Event().wait(0.01)
+
+    assert threads and threads[0] is not threading.main_thread()
+    assert str(widgets["txt_input"].cget("state")) == "normal"
+    root.destroy()
+
+
+def test_api_label_click_only_opens_settings_when_clickable():
+    """Clicks on the API label are ignored unless it is showing the link."""
+    opened = []
+    api_link = {"clickable": False}
+
+    app.on_api_label_click(api_link, opened.append, "click1")
+    assert opened == []
+    # The key went missing, so the label turns into a link
+    api_link["clickable"] = True
+    app.on_api_label_click(api_link, opened.append, "click2")
+    assert opened == ["click2"]
+
+
+def test_send_while_api_check_pending(monkeypatch):
+    """The prompt box stays locked until the key check finishes."""
+    import threading
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        pytest.skip("Tkinter display not available")
+
+    release = threading.Event()
+    submitted = []
+
+    def slow_verify(_key):
+        # Hold the check open until the test has tried to send
+        release.wait(5)
+        return True
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(app, "verify_api_key_cached", slow_verify)
+    monkeypatch.setattr(app.runner, "submit_request", lambda *a: submitted.append(a))
+    monkeypatch.setattr(app.runner, "request_active", False)
+
+    widgets, check_api = app.build_ui(root)
+    txt_input = widgets["txt_input"]
+    widgets["work_dir_var"].set("/tmp")
+    check_api()
+    assert str(txt_input.cget("state")) == "disabled"
+    # Typing and Enter do nothing while the check is pending
+    txt_input.insert("1.0", "hello")
+    txt_input.event_generate("<Return>")
+    root.update()
+    assert submitted == []
+
+    # A request that started anyway keeps the box locked when the check passes
+    monkeypatch.setattr(app.runner, "request_active", True)
+    release.set()
+    for _ in range(100):
+        app.runner.drain_ui_queue()
+        root.update()
+        if "verified" in widgets["api_status_label"].cget("text"):
+            break
+        threading.Event().wait(0.01)
+    assert "verified" in widgets["api_status_label"].cget("text")
+    assert str(txt_input.cget("state")) == "disabled"
+    root.destroy()
+
+
+def test_history_window_reused_and_extended(monkeypatch):
+    """Reopening history keeps one window and only adds new rows."""
+    from tkinter import ttk
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        pytest.skip("Tkinter display not available")
+
+    monkeypatch.setattr(app.runner, "request_history", [])
+    widgets, _ = app.build_ui(root)
+    app.runner.record_request("req1", "abc1234", failure_reason=None)
+    widgets["history_btn"].invoke()
+    app.runner.record_request("req2", None, failure_reason="boom")
+    widgets["history_btn"].invoke()
+
+    windows = [w for w in root.winfo_children() if isinstance(w, tk.Toplevel)]
+    assert len(windows) == 1  # The second click reused the open window
+    tree = next(w for w in windows[0].winfo_children() if isinstance(w, ttk.Treeview))
+    assert tree.get_children() == ("0", "1")
+    root.destroy()
+
+
+def test_history_window_hidden_not_destroyed_on_close(monkeypatch):
+    """Closing history hides the window so reopening keeps its rows."""
+    from tkinter import ttk
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        pytest.skip("Tkinter display not available")
+
+    monkeypatch.setattr(app.runner, "request_history", [])
+    app.runner.record_request("req1", None, failure_reason="x")
+    widgets, _ = app.build_ui(root)
+    widgets["history_btn"].invoke()
+    win = next(w for w in root.winfo_children() if isinstance(w, tk.Toplevel))
+    # Close it the way the title bar button does
+    win.tk.call(win.protocol("WM_DELETE_WINDOW"))
+    assert win.winfo_exists() and win.state() == "withdrawn"
+
+    app.runner.record_request("req2", None, failure_reason="y")
+    widgets["history_btn"].invoke()
+    assert win.state() == "normal"
+    tree = next(w for w in win.winfo_children() if isinstance(w, ttk.Treeview))
+    assert tree.get_children() == ("0", "1")
+    root.destroy()
+
+
+def test_make_read_only_blocks_non_key_edits():
+    """Paste, cut and middle-click paste are blocked and Tab skips the box."""
+
+    class DummyText:
+        def __init__(self):
+            self.bindings = {}
+            self.options = {}
+
+        def bind(self, sequence, func):
+            self.bindings[sequence] = func
+
+        def configure(self, **kwargs):
+            self.options.update(kwargs)
+
+    widget = DummyText()
+    app.make_read_only(widget)
+
+    for sequence in ("<<Paste>>", "<<Cut>>", "<<Clear>>", "<<PasteSelection>>"):
+        assert widget.bindings[sequence](None) == "break"
+    assert widget.bindings["<Key>"] is app.block_edit_key
+    assert widget.options["takefocus"] == 0
+
+
+def test_history_window_loads_rows_a_page_at_a_time(monkeypatch):
+    """A long history only inserts the first page when the window opens."""
+    from tkinter import ttk
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        pytest.skip("Tkinter display not available")
+
+    monkeypatch.setattr(app.runner, "request_history", [])
+    for i in range(app.HISTORY_PAGE_ROWS * 3):
+        app.runner.record_request(f"req{i}", None, failure_reason="x")
+    widgets, _ = app.build_ui(root)
+    widgets["history_btn"].invoke()
+    root.update()
+
+    win = next(w for w in root.winfo_children() if isinstance(w, tk.Toplevel))
+    tree = next(w for w in win.winfo_children() if isinstance(w, ttk.Treeview))
+    shown = len(tree.get_children())
+    assert 0 < shown < len(app.runner.request_history)
+    # Scrolling to the end pulls in the next page
+    tree.yview_moveto(1.0)
+    root.update()
+    assert len(tree.get_children()) > shown
+    root.destroy()
+
+
+def test_history_rows_formatted_once(monkeypatch):
+    """Closing and reopening history reuses the already formatted rows."""
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        pytest.skip("Tkinter display not available")
+
+    calls = []
+    real_format = app.format_history_row
+
+    def counting_format(rec):
+        calls.append(rec["request_id"])
+        return real_format(rec)
+
+    monkeypatch.setattr(app, "format_history_row", counting_format)
+    monkeypatch.setattr(app.runner, "request_history", [])
+    app.runner.record_request("req1", None, failure_reason="x")
+    widgets, _ = app.build_ui(root)
+    widgets["history_btn"].invoke()
+    win = next(w for w in root.winfo_children() if isinstance(w, tk.Toplevel))
+    # Close it the way the title bar button does
+    win.tk.call(win.protocol("WM_DELETE_WINDOW"))
+    widgets["history_btn"].invoke()
+
+    assert calls == ["req1"]
+    root.destroy()
+
+
+def test_load_history_page_restarts_when_history_replaced(monkeypatch):
+    """Swapping in a different history list re-formats rows and resets the table."""
+
+    class FakeTree:
+        def __init__(self):
+            self.items = []
+
+        def get_children(self):
+            return tuple(str(i) for i in range(len(self.items)))
+
+        def delete(self, *ids):
+            self.items.clear()
+
+    def fake_insert(tree, first_idx, rows):
+        # Item ids must line up with the list position they map back to
+        assert first_idx == len(tree.items)
+        tree.items.extend(rows)
+
+    monkeypatch.setattr(app, "insert_tree_rows", fake_insert)
+    tree = FakeTree()
+    history = {"tree": tree, "shown": 0, "rows": [], "records": None}
+    old = [{"request_id": "old1"}, {"request_id": "old2"}]
+    app.load_history_page(history, old)
+
+    # A new list of the same length must not reuse the old formatted rows
+    new = [{"request_id": "new1"}, {"request_id": "new2"}]
+    app.load_history_page(history, new)
+    assert [row[0] for row in tree.items] == ["new1", "new2"]
+    assert history["rows"] == tree.items
+
+    # Appending to the same list only adds the new record
+    new.append({"request_id": "new3"})
+    app.load_history_page(history, new)
+    assert [row[0] for row in tree.items] == ["new1", "new2", "new3"]
+
+
+def test_tcl_quote_round_trips_awkward_text():
+    """Quoted values come back unchanged when Tcl evaluates them."""
+    tcl = tk.Tcl()
+    for text in ["", "plain", "two words", "{unbalanced", "a}b", "$var [cmd]",
+                 'say "hi"', "back\\slash\\", "line\nbreak\ttab\r", "semi;colon",
+                 "nul\x00byte", "\x00"]:
+        tcl.eval(f"set value {app._tcl_quote(text)}")
+        assert tcl.getvar("value") == text
+
+
+def test_insert_tree_rows_uses_one_script():
+    """A page of rows is sent to Tcl as one script with indexed item ids."""
+    interp = tk.Tcl()
+    # Stand in for the Treeview command so the script can really run
+    interp.eval("proc .tree {args} { lappend ::calls $args }")
+    scripts = []
+
+    class FakeTree:
+        class tk:
+            @staticmethod
+            def eval(script):
+                scripts.append(script)
+                interp.eval(script)
+
+        def __str__(self):
+            return ".tree"
+
+    app.insert_tree_rows(FakeTree(), 5, [("a b", 1, 0.5), ("{x", 2, "")])
+
+    assert len(scripts) == 1
+    split = interp.tk.splitlist
+    calls = [split(c) for c in split(interp.getvar("calls"))]
+    assert [c[:5] for c in calls] == [
+        ("insert", "", "end", "-id", "5"),
+        ("insert", "", "end", "-id", "6"),
+    ]
+    assert split(calls[0][6]) == ("a b", "1", "0.5")
+    assert split(calls[1][6]) == ("{x", "2", "")
+
+
+def test_history_columns_match_row_layout():
+    """Column specs line up with the values ``format_history_row`` returns."""
+    names = [col for col, *_ in app.HISTORY_COLUMNS]
+    assert names == [
+        "request_id",
+        "commit_id",
+        "lines",
+        "files",
+        "cost",
+        "failure_reason",
+        "description",
+    ]
+    assert len(app.format_history_row({})) == len(names)
+    specs = {col: (heading, anchor) for col, heading, _w, anchor in app.HISTORY_COLUMNS}
+    assert specs["request_id"] == ("Request Id", "w")
+    assert specs["cost"] == ("Cost", "e")
@@ -1,6 +1,8 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure project root is on path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
@@ -9,6 +11,8 @@ from utils.git import (
     format_history_row,
     format_history_row_full,
     history_records_to_tsv,
+    append_history_record,
+    load_history_records,
     HISTORY_COL_WIDTHS,
 )
 
@@ -92,3 +96,32 @@ def test_history_records_to_tsv_uses_full_values():
     assert lines[0].startswith("1234567890abcdef\tfedcba0987654321")
     # Second row should contain the second set of IDs
     assert lines[1].startswith("abcdef1234567890\t0123456789abcdef")
+
+
+def test_history_records_round_trip_through_jsonl(tmp_path: Path):
+    """Appended records should load back in order, skipping a damaged last line."""
+    path = tmp_path / "history.jsonl"
+    # No file yet means no saved history
+    assert load_history_records(path) == []
+
+    first = {"request_id": "a", "commit_id": "abc1234", "cost": 0.1}
+    second = {"request_id": "b", "commit_id": None, "failure_reason": "boom"}
+    append_history_record(first, path)
+    append_history_record(second, path)
+    # Simulate a crash that left half a record at the end of the file
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write('{"request_id": "c", "comm')
+
+    assert load_history_records(path) == [first, second]
+
+
+def test_history_records_reject_corrupt_middle_line(tmp_path: Path):
+    """Only the last line may be damaged; corruption earlier must raise."""
+    path = tmp_path / "history.jsonl"
+    append_history_record({"request_id": "a"}, path)
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write("garbage\n")
+    append_history_record({"request_id": "b"}, path)
+
+    with pytest.raises(ValueError, match="line 2"):
+        load_history_records(path)
@@ -8,6 +8,71 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from nolight import runner
 
+# Output cap as shipped, captured before any test can change it
+DEFAULT_OUTPUT_MAX_LINES = runner.OUTPUT_MAX_LINES
+
+
+@pytest.fixture(autouse=True)
+def fresh_runner_state(monkeypatch):
+    """Give every test an empty UI queue and history and the default cap."""
+    # Discard leftover updates without running them; their widgets are gone.
+    while not runner.ui_queue.empty():
+        runner.ui_queue.get_nowait()
+    monkeypatch.setattr(runner, "request_history", [])
+    monkeypatch.setattr(runner, "history_path", None)
+    monkeypatch.setattr(runner, "OUTPUT_MAX_LINES", DEFAULT_OUTPUT_MAX_LINES)
+
+
+class DummyText:
+    """Stand-in for the Tk text widgets the runner writes to.
+
+    It keeps the shown text as a list of lines so trimming can be checked, and
+    records inserts, deletes, scrolls and state changes for assertions.
+    """
+
+    def __init__(self, view_end: float = 1.0):
+        self.lines = []  # Text currently shown, one entry per line
+        self.inserts = []  # Every inserted chunk, in order
+        self.deletes = []  # ``(start, end)`` of every delete
+        self.moves = []  # Fractions passed to ``yview_moveto``
+        self.states = []  # Every ``state`` applied through configure/config
+        self.view_end = view_end  # Visible fraction end reported by yview
+
+    @property
+    def text(self) -> str:
+        """Everything inserted so far, joined together."""
+        return "".join(self.inserts)
+
+    def insert(self, idx, txt):
+        self.inserts.append(txt)
+        if idx == "1.0":
+            self.lines[:0] = txt.splitlines()
+        else:
+            self.lines.extend(txt.splitlines())
+
+    def delete(self, start, end):
+        # Tk indexes are 1-based; "N.0" deletes everything before line N
+        self.deletes.append((start, end))
+        self.lines = self.lines[int(end.split(".")[0]) - 1:]
+
+    def index(self, _idx):
+        return f"{len(self.lines)}.0"
+
+    def yview(self):
+        return (0.0, self.view_end)
+
+    def yview_moveto(self, fraction):
+        self.moves.append(fraction)
+
+    def configure(self, **kwargs):
+        if "state" in kwargs:
+            self.states.append(kwargs["state"])
+
+    config = configure  # ``Text`` aliases ``config`` to ``configure``
+
+    def focus_set(self):
+        pass
+
 
 def test_record_request_success():
     """Stats should populate line and file totals."""
@@ -41,29 +106,26 @@ def test_record_request_failure():
     assert rec["failure_reason"] == "error"
 
 
-def test_run_aider_includes_agents_and_readme(monkeypatch):
-    """run_aider should always pass AGENTS.md and README.md to aider."""
+def test_record_request_appends_to_history_file(monkeypatch, tmp_path):
+    """With a history file configured, each record is also saved to disk."""
+    from utils.git import load_history_records
+
     runner.request_history.clear()
+    path = tmp_path / "history.jsonl"
+    monkeypatch.setattr(runner, "history_path", path)
 
-    captured = {}
+    runner.record_request("id3", None, failure_reason="error")
 
-    # Minimal Tk stand-ins so runner can call the expected methods
-    class DummyText:
-        def insert(self, *_args):
-            pass
+    assert load_history_records(path) == runner.request_history
 
-        def see(self, *_args):
-            pass
 
-        def configure(self, **_kwargs):
-            pass
-
-        def config(self, **_kwargs):
-            pass
+def test_run_aider_includes_agents_and_readme(monkeypatch):
+    """run_aider should always pass AGENTS.md and README.md to aider."""
+    runner.request_history.clear()
 
-        def focus_set(self):
-            pass
+    captured = {}
 
+    # Minimal Tk stand-ins so runner can call the expected methods
     class DummyVar:
         def set(self, _val):
             pass
@@ -79,7 +141,7 @@ def test_run_aider_includes_agents_and_readme(monkeypatch):
         def __init__(self, cmd, *args, **kwargs):
             # Remember the full command so we can assert on it later
             captured["cmd"] = cmd
-            self.stdout = io.StringIO("")  # No output needed for this test
+            self.stdout = io.BytesIO(b"")  # No output needed for this test
             self.returncode = 0
 
         def wait(self):
@@ -105,6 +167,8 @@ def test_run_aider_includes_agents_and_readme(monkeypatch):
         status_label=status_label,
         request_id="req_agents",
     )
+    # Apply the widget updates the worker queued for the Tk thread
+    runner.drain_ui_queue()
 
     # The aider command should include the project rules and README for context
     assert "AGENTS.md" in captured["cmd"]
@@ -116,22 +180,6 @@ def test_run_aider_no_commit_fails(monkeypatch):
     runner.request_history.clear()
 
     # Dummy stand-ins for Tk widgets so runner can interact with them
-    class DummyText:
-        def insert(self, *_args):
-            pass
-
-        def see(self, *_args):
-            pass
-
-        def configure(self, **_kwargs):
-            pass
-
-        def config(self, **_kwargs):
-            pass
-
-        def focus_set(self):
-            pass
-
     class DummyVar:
         def __init__(self):
             self.value = ""
@@ -149,7 +197,7 @@ def test_run_aider_no_commit_fails(monkeypatch):
     class MockPopen:
         def __init__(self, *args, **kwargs):
             # Aider prints a line but doesn't commit anything and exits cleanly
-            self.stdout = io.StringIO("hi\n")
+            self.stdout = io.BytesIO(b"hi\n")
             self.returncode = 0
 
         def wait(self):
@@ -175,35 +223,19 @@ def test_run_aider_no_commit_fails(monkeypatch):
         status_label=status_label,
         request_id="req_no_commit",
     )
+    # Apply the widget updates the worker queued for the Tk thread
+    runner.drain_ui_queue()
 
     rec = runner.request_history[0]
     assert rec["commit_id"] is None
     assert rec["failure_reason"] == "aider exited with code 0: hi"
 
+
 def test_run_aider_records_exit_reason(monkeypatch):
     """run_aider should store exit code and last line on failure."""
     runner.request_history.clear()
 
     # Simple stand-ins for the Tk widgets so run_aider can interact with them
-    class DummyText:
-        def __init__(self):
-            self.text = ""
-
-        def insert(self, _idx, txt):
-            self.text += txt  # Append text to mimic a Tk widget
-
-        def see(self, _idx):
-            pass
-
-        def configure(self, **kwargs):
-            pass
-
-        def config(self, **kwargs):
-            pass
-
-        def focus_set(self):
-            pass
-
     class DummyVar:
         def __init__(self):
             self.value = ""
@@ -223,7 +255,7 @@ def test_run_aider_records_exit_reason(monkeypatch):
     class MockPopen:
         def __init__(self, *args, **kwargs):
             # Provide two lines of output, the last being an error
-            self.stdout = io.StringIO("ok\nboom\n")
+            self.stdout = io.BytesIO(b"ok\nboom\n")
             self.returncode = 2
 
         def wait(self):
@@ -249,6 +281,8 @@ def test_run_aider_records_exit_reason(monkeypatch):
         status_label=status_label,
         request_id="req1",
     )
+    # Apply the widget updates the worker queued for the Tk thread
+    runner.drain_ui_queue()
 
     rec = runner.request_history[0]
     assert rec["failure_reason"] == "aider exited with code 2: boom"
@@ -262,22 +296,6 @@ def test_run_aider_prompts_for_more_input(monkeypatch):
     runner.request_history.clear()
     runner.request_active = True  # Simulate an ongoing request
 
-    class DummyText:
-        def insert(self, *_args):
-            pass  # Output is ignored for this behavior check
-
-        def see(self, *_args):
-            pass
-
-        def configure(self, **_kwargs):
-            pass
-
-        def config(self, **_kwargs):
-            pass
-
-        def focus_set(self):
-            pass
-
     class DummyVar:
         def __init__(self):
             self.value = ""
@@ -298,7 +316,7 @@ def test_run_aider_prompts_for_more_input(monkeypatch):
             msg = (
                 "These are the files we might edit. I will stop here so you can add them to the chat.\n"
             )
-            self.stdout = io.StringIO(msg)
+            self.stdout = io.BytesIO(msg.encode())
             self.returncode = 0
 
         def wait(self):
@@ -324,6 +342,8 @@ def test_run_aider_prompts_for_more_input(monkeypatch):
         status_label=status_label,
         request_id="req2",
     )
+    # Apply the widget updates the worker queued for the Tk thread
+    runner.drain_ui_queue()
 
     # Request should remain active waiting for follow-up input
     assert runner.request_active
@@ -338,22 +358,6 @@ def test_run_aider_strips_ansi_from_failure_reason(monkeypatch):
     runner.request_history.clear()
 
     # Minimal stand-ins for the Tk widgets so the runner can interact with them
-    class DummyText:
-        def insert(self, *_args):
-            pass  # Output is irrelevant for this test
-
-        def see(self, *_args):
-            pass
-
-        def configure(self, **_kwargs):
-            pass
-
-        def config(self, **_kwargs):
-            pass
-
-        def focus_set(self):
-            pass
-
     class DummyVar:
         def __init__(self):
             self.value = ""
@@ -371,7 +375,7 @@ def test_run_aider_strips_ansi_from_failure_reason(monkeypatch):
     # Mock Popen to emit a red-colored error line then exit with code 1
     class MockPopen:
         def __init__(self, *args, **kwargs):
-            self.stdout = io.StringIO("\x1b[31mboom\x1b[0m\n")
+            self.stdout = io.BytesIO(b"\x1b[31mboom\x1b[0m\n")
             self.returncode = 1
 
         def wait(self):
@@ -397,6 +401,8 @@ def test_run_aider_strips_ansi_from_failure_reason(monkeypatch):
         status_label=status_label,
         request_id="req_color",
     )
+    # Apply the widget updates the worker queued for the Tk thread
+    runner.drain_ui_queue()
 
     rec = runner.request_history[0]
     assert rec["failure_reason"] == "aider exited with code 1: boom"
@@ -408,26 +414,7 @@ def test_run_aider_strips_ansi_from_output(monkeypatch):
 
     runner.request_history.clear()
 
-    # Dummy widgets to capture what the runner writes to the output box
-    class DummyText:
-        def __init__(self):
-            self.text = ""
-
-        def insert(self, _idx, txt):
-            self.text += txt  # Record text shown to the user
-
-        def see(self, _idx):
-            pass
-
-        def configure(self, **_kwargs):
-            pass
-
-        def config(self, **_kwargs):
-            pass
-
-        def focus_set(self):
-            pass
-
+    # Status stand-ins; the shared DummyText captures what reaches the output box
     class DummyVar:
         def set(self, _val):
             pass
@@ -442,7 +429,7 @@ def test_run_aider_strips_ansi_from_output(monkeypatch):
     # Mock aider emitting a green commit line wrapped in ANSI codes
     class MockPopen:
         def __init__(self, *args, **kwargs):
-            self.stdout = io.StringIO("\x1b[32mCommitted abcdef1\x1b[0m\n")
+            self.stdout = io.BytesIO(b"\x1b[32mCommitted abcdef1\x1b[0m\n")
             self.returncode = 0
 
         def wait(self):
@@ -471,6 +458,8 @@ def test_run_aider_strips_ansi_from_output(monkeypatch):
         status_label=status_label,
         request_id="req_strip",
     )
+    # Apply the widget updates the worker queued for the Tk thread
+    runner.drain_ui_queue()
 
     # The output shown to the user should not include raw ANSI codes
     assert "\x1b" not in output.text
@@ -484,26 +473,6 @@ def test_run_aider_reports_empty_output(monkeypatch):
 
     runner.request_history.clear()
 
-    class DummyText:
-        def __init__(self):
-            self.text = ""
-
-        def insert(self, _idx, txt):
-            # Append any text that runner writes to mimic a Tk widget.
-            self.text += txt
-
-        def see(self, _idx):
-            pass
-
-        def configure(self, **kwargs):
-            pass
-
-        def config(self, **kwargs):
-            pass
-
-        def focus_set(self):
-            pass
-
     class DummyVar:
         def __init__(self):
             self.value = ""
@@ -522,7 +491,7 @@ def test_run_aider_reports_empty_output(monkeypatch):
     class MockPopen:
         def __init__(self, *args, **kwargs):
             # Simulate aider producing no output before exiting with an error.
-            self.stdout = io.StringIO("")
+            self.stdout = io.BytesIO(b"")
             self.returncode = 1
 
         def wait(self):
@@ -548,6 +517,8 @@ def test_run_aider_reports_empty_output(monkeypatch):
         status_label=status_label,
         request_id="req1",
     )
+    # Apply the widget updates the worker queued for the Tk thread
+    runner.drain_ui_queue()
 
     rec = runner.request_history[0]
     # The failure reason should include our placeholder message.
@@ -560,25 +531,6 @@ def test_run_aider_records_cost(monkeypatch):
     runner.request_history.clear()
     runner.session_total_cost = 0.0
 
-    class DummyText:
-        def __init__(self):
-            self.text = ""
-
-        def insert(self, _idx, txt):
-            self.text += txt
-
-        def see(self, _idx):
-            pass
-
-        def configure(self, **kwargs):
-            pass
-
-        def config(self, **kwargs):
-            pass
-
-        def focus_set(self):
-            pass
-
     class DummyVar:
         def __init__(self):
             self.value = ""
@@ -596,8 +548,8 @@ def test_run_aider_records_cost(monkeypatch):
     class MockPopen:
         def __init__(self, *args, **kwargs):
             # Include cost line so the runner can parse it
-            self.stdout = io.StringIO(
-                "Committed abcdef1\nTokens: cost line\nCost: $0.50 message, $0.50 session.\n"
+            self.stdout = io.BytesIO(
+                b"Committed abcdef1\nTokens: cost line\nCost: $0.50 message, $0.50 session.\n"
             )
             self.returncode = 0
 
@@ -627,6 +579,8 @@ def test_run_aider_records_cost(monkeypatch):
         status_label=status_label,
         request_id="req1",
     )
+    # Apply the widget updates the worker queued for the Tk thread
+    runner.drain_ui_queue()
 
     rec = runner.request_history[0]
     assert rec["cost"] == pytest.approx(0.50)
@@ -693,3 +647,337 @@ def test_update_status_sets_message_and_color():
     runner.update_status(var, lbl, "hello", "green")
     assert var.value == "hello"
     assert lbl.fg == "green"
+
+
+def test_run_aider_leaves_output_state_alone(monkeypatch):
+    """Streaming output should never unlock or relock the output box."""
+    runner.request_history.clear()
+
+    class DummyVar:
+        def set(self, _val):
+            pass
+
+    class DummyLabel:
+        def config(self, **_kwargs):
+            pass
+
+        def unbind(self, *_args, **_kwargs):
+            pass
+
+    class MockPopen:
+        def __init__(self, *args, **kwargs):
+            # Plenty of lines so any per-line toggling would be obvious
+            self.stdout = io.BytesIO(b"line\n" * 50)
+            self.returncode = 1
+
+        def wait(self):
+            return self.returncode
+
+        def kill(self):
+            pass
+
+    monkeypatch.setattr(runner.subprocess, "Popen", lambda *a, **k: MockPopen())
+
+    output = DummyText()
+    runner.run_aider(
+        msg="hi",
+        output_widget=output,
+        txt_input=DummyText(),
+        work_dir=".",
+        model="gpt-5",
+        status_var=DummyVar(),
+        status_label=DummyLabel(),
+        request_id="req_state",
+    )
+    # Apply the widget updates the worker queued for the Tk thread
+    runner.drain_ui_queue()
+
+    # The box is read-only through key bindings, so its state is never touched
+    assert output.states == []
+
+
+def test_append_output_only_follows_when_at_bottom():
+    """New output should not yank the view away from a user who scrolled up."""
+
+    following = DummyText(1.0)
+    runner.append_output(following, "new\n")
+    assert following.moves == [1.0]
+
+    reading = DummyText(0.4)  # User scrolled back to read earlier output
+    runner.append_output(reading, "new\n")
+    assert reading.moves == []
+
+
+def test_append_output_trims_oldest_lines_past_cap(monkeypatch):
+    """A long session drops old lines in one delete instead of growing forever."""
+    monkeypatch.setattr(runner, "OUTPUT_MAX_LINES", 20)
+    monkeypatch.setattr(runner, "OUTPUT_TRIM_LINES", 4)
+
+    widget = DummyText()
+    runner.append_output(widget, "".join(f"{i}\n" for i in range(20)))
+    assert widget.deletes == []  # At the cap, nothing is dropped yet
+    runner.append_output(widget, "20\n")
+    # One delete leaves room for several more batches before the next trim
+    assert len(widget.deletes) == 1
+    notice = runner.OUTPUT_TRIM_NOTICE.strip()
+    assert widget.lines == [notice] + [str(i) for i in range(5, 21)]
+    # Later trims replace the notice rather than stacking another one
+    runner.append_output(widget, "".join(f"{i}\n" for i in range(21, 25)))
+    assert len(widget.deletes) == 2
+    assert widget.lines.count(notice) == 1 and widget.lines[0] == notice
+
+
+def test_append_output_small_cap_keeps_recent_lines(monkeypatch):
+    """A configured cap below the trim headroom still leaves output visible."""
+    monkeypatch.setattr(runner, "OUTPUT_TRIM_LINES", 2000)
+
+    widget = DummyText()
+    # The cap is passed in explicitly rather than read from the module default
+    runner.append_output(widget, "".join(f"{i}\n" for i in range(6)), max_lines=5)
+    assert widget.lines[-1] == "5"
+    assert 1 < len(widget.lines) <= 5
+
+
+def test_output_buffer_passes_line_cap_to_output():
+    """A buffer created with a line cap trims the box to that cap."""
+    widget = DummyText()
+    buf = runner.OutputBuffer(widget, interval=3600, output_max_lines=5)
+    for i in range(30):
+        buf.write(f"{i}\n")
+    buf.flush()
+    runner.drain_ui_queue()
+    assert widget.lines[-1] == "29"
+    assert len(widget.lines) <= 5
+
+
+def test_output_buffer_batches_lines_in_order():
+    """Lines are handed to the widget in batches without reordering."""
+
+    widget = DummyText()
+    # A long interval means only the line cap or an explicit flush sends text
+    buf = runner.OutputBuffer(widget, max_lines=2, interval=3600)
+    buf.write("a\n")
+    runner.drain_ui_queue()
+    assert widget.text == ""  # Still waiting for the batch to fill
+    buf.write("b\n")
+    runner.drain_ui_queue()
+    assert widget.text == "a\nb\n"  # Cap reached, so both lines went at once
+    buf.write("c\n")
+    buf.flush()
+    buf.flush()  # Flushing an empty buffer should not queue anything
+    assert runner.drain_ui_queue() == 1
+    assert widget.text == "a\nb\nc\n"
+    assert len(widget.inserts) == 2
+
+
+def test_output_buffer_coalesces_batches_until_drained():
+    """Batches handed over before the Tk thread drains share a single insert."""
+
+    widget = DummyText()
+    buf = runner.OutputBuffer(widget, max_lines=1, interval=3600)
+    for line in ("a\n", "b\n", "c\n"):
+        buf.write(line)  # Each write fills a batch and hands it over
+    assert runner.ui_queue.qsize() == 1  # Only the first batch queued a drain
+
+    runner.drain_ui_queue()  # The Tk thread catches up
+    assert widget.inserts == ["a\nb\nc\n"]
+
+    buf.write("d\n")  # Later output queues a fresh drain
+    assert runner.ui_queue.qsize() == 1
+    runner.drain_ui_queue()
+
+
+def test_output_buffer_flushes_stale_text():
+    """A slow trickle of lines is still shown once the interval elapses."""
+
+    widget = DummyText()
+    # A zero interval means every write is already past its deadline
+    buf = runner.OutputBuffer(widget, max_lines=100, interval=0)
+    buf.write("slow line\n")
+    runner.drain_ui_queue()
+    assert widget.text == "slow line\n"
+
+
+def test_iter_lines_calls_on_idle_while_stream_is_quiet():
+    """Silence on the pipe should trigger the idle callback between lines."""
+    import os
+
+    read_fd, write_fd = os.pipe()
+    stream = os.fdopen(read_fd, "rb")
+    os.write(write_fd, b"first\n")
+    idle_calls = []
+
+    def on_idle():
+        # Only produce the second line after the reader reported silence
+        idle_calls.append(True)
+        if len(idle_calls) == 1:
+            os.write(write_fd, b"second\n")
+            os.close(write_fd)
+
+    lines = list(runner.iter_lines(stream, on_idle, idle_timeout=0.01))
+    stream.close()
+
+    assert lines == ["first\n", "second\n"]
+    assert idle_calls  # The quiet period was noticed at least once
+
+
+def test_iter_lines_decodes_chunks_across_boundaries():
+    """Characters and CRLF pairs split between reads still decode cleanly."""
+
+    class ChunkedStream:
+        def __init__(self, chunks):
+            self.chunks = list(chunks)
+
+        def read1(self, _size):
+            # Hand back one pre-split chunk per call, then EOF
+            return self.chunks.pop(0) if self.chunks else b""
+
+    data = "caf\u00e9 ok\r\nnext\rlast".encode("utf-8")
+    # Split inside the two-byte "\u00e9" and between "\r" and "\n"
+    chunks = [data[:4], data[4:9], data[9:]]
+    assert chunks[1].endswith(b"\r")
+
+    lines = list(runner.iter_lines(ChunkedStream(chunks), lambda: None, 1))
+
+    assert lines == ["caf\u00e9 ok\n", "next\n", "last"]
+
+
+def test_iter_lines_reuses_reader_thread_between_runs():
+    """Back-to-back runs reuse an idle reader instead of starting a new thread."""
+    import threading
+
+    class OneLineStream:
+        def __init__(self):
+            self.sent = False
+
+        def read1(self, _size):
+            if self.sent:
+                return b""
+            self.sent = True
+            return b"line\n"
+
+    def run():
+        assert list(runner.iter_lines(OneLineStream(), lambda: None, 1)) == ["line\n"]
+
+    run()  # Starts a reader if none is idle yet
+    threads = threading.active_count()
+    for _ in range(3):
+        run()
+    assert threading.active_count() == threads
+
+
+def test_iter_lines_not_blocked_by_unfinished_stream():
+    """A run whose pipe is still open doesn't hold up reading the next one."""
+    import os
+
+    read_fd, write_fd = os.pipe()
+    stuck = os.fdopen(read_fd, "rb")
+    os.write(write_fd, b"first\n")
+    # The reader is now waiting on the open pipe for more output
+    first = runner.iter_lines(stuck, lambda: None, 0.01)
+    assert next(first) == "first\n"
+
+    class DoneStream:
+        def read1(self, _size):
+            return b""
+
+    assert list(runner.iter_lines(DoneStream(), lambda: None, 1)) == []
+    os.close(write_fd)
+    assert list(first) == []
+    stuck.close()
+
+
+def test_submit_request_runs_jobs_on_one_worker(monkeypatch):
+    """Queued requests run in order on a single reusable worker thread."""
+    import threading
+
+    calls = []
+
+    def fake_run_aider(msg, *_args):
+        # Remember which thread handled each request
+        calls.append((msg, threading.get_ident()))
+        if msg == "boom":
+            raise RuntimeError("request crashed")
+
+    monkeypatch.setattr(runner, "run_aider", fake_run_aider)
+
+    runner.submit_request("first")
+    runner.submit_request("boom")  # A crash must not stop later requests
+    runner.submit_request("second")
+    runner.job_queue.join()
+
+    assert [msg for msg, _tid in calls] == ["first", "boom", "second"]
+    # Every request was served by the same long-lived thread
+    assert len({tid for _msg, tid in calls}) == 1
+
+
+def test_run_aider_routes_widget_updates_through_tk_queue(monkeypatch):
+    """Status and input updates from the worker wait in the UI queue."""
+    runner.request_history.clear()
+
+    class DummyVar:
+        def __init__(self):
+            self.value = None
+
+        def set(self, val):
+            self.value = val
+
+    class DummyLabel:
+        def config(self, **_kwargs):
+            pass
+
+        def unbind(self, *_args, **_kwargs):
+            pass
+
+    class MockPopen:
+        def __init__(self, *args, **kwargs):
+            self.stdout = io.BytesIO(b"some output\n")
+            self.returncode = 1
+
+        def wait(self):
+            return self.returncode
+
+        def kill(self):
+            pass
+
+    monkeypatch.setattr(runner.subprocess, "Popen", lambda *a, **k: MockPopen())
+
+    txt_input = DummyText()
+    status_var = DummyVar()
+    runner.run_aider(
+        msg="hi",
+        output_widget=DummyText(),
+        txt_input=txt_input,
+        work_dir=".",
+        model="gpt-5",
+        status_var=status_var,
+        status_label=DummyLabel(),
+        request_id="req_queue",
+    )
+
+    # Nothing touched the widgets directly from the worker thread
+    assert status_var.value is None
+    assert txt_input.states == []
+
+    # Draining the queue on the Tk thread applies the updates in order
+    runner.drain_ui_queue()
+    assert "failed" in status_var.value
+    assert txt_input.states == ["normal"]
+
+
+def test_drain_ui_queue_survives_failing_update():
+    """A broken update is reported and the ones behind it still run."""
+    ran = []
+
+    def broken():
+        raise RuntimeError("widget destroyed")
+
+    runner.post(broken)
+    runner.post(ran.append, "after")
+    runner.post(ran.append, "later")
+
+    # ``max_items`` bounds how much one pump tick does
+    assert runner.drain_ui_queue(max_items=2) == 2
+    assert ran == ["after"]
+    assert runner.drain_ui_queue() == 1
+    assert ran == ["after", "later"]
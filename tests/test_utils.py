@@ -23,11 +23,35 @@ def test_sanitize_removes_noise():
     assert text_utils.sanitize(raw) == "Hello Quote Test"
 
 
+def test_sanitize_handles_crlf_and_double_quotes():
+    """Windows line endings become single spaces and double quotes vanish."""
+    raw = ' fix\r\n"the" \tbug\r\n'
+    assert text_utils.sanitize(raw) == "fix the bug"
+
+
+def test_sanitize_fast_path_matches_full_cleanup():
+    """Clean prompts skip the heavy path but must give identical results."""
+    # Already-clean text comes back trimmed but otherwise untouched
+    assert text_utils.sanitize("  add a jump button ") == "add a jump button"
+    # Tabs and non-breaking spaces still collapse to a single space
+    assert text_utils.sanitize("add\ta\u00a0button") == "add a button"
+    assert text_utils.sanitize("two  spaces") == "two spaces"
+
+
 def test_should_suppress_matches_known_warning():
     line = "Can't initialize prompt toolkit: No Windows console found"
     assert text_utils.should_suppress(line)
 
 
+def test_should_suppress_checks_every_pattern_at_line_start():
+    """Each known warning is suppressed, but only when it starts the line."""
+    # The second pattern must still be honored after merging the regexes
+    assert text_utils.should_suppress("Terminal does not support pretty output (UnicodeDecodeError)")
+    # Mentions in the middle of a line are regular output and stay visible
+    assert not text_utils.should_suppress("note: Terminal does not support pretty output")
+    assert not text_utils.should_suppress("Aider v0.86.1")
+
+
 def test_verify_api_key_success():
     """A 200 response should validate the key."""
 
@@ -61,12 +85,130 @@ def test_verify_api_key_missing():
         api_utils.verify_api_key("")
 
 
+def test_verify_api_key_cached_reuses_success(monkeypatch, tmp_path: Path):
+    """A verified key is not re-checked until the TTL expires."""
+    monkeypatch.setattr(api_utils, "_verify_cache", {})
+    cache = tmp_path / "key_cache.json"
+    calls = []
+
+    def fake_request(url, headers):
+        calls.append(headers["Authorization"])
+        resp = types.SimpleNamespace()
+        resp.status_code = 200
+        return resp
+
+    def check(key, **kwargs):
+        return api_utils.verify_api_key_cached(
+            key, request_fn=fake_request, cache_path=cache, **kwargs
+        )
+
+    assert check("key")
+    assert check("key")
+    assert len(calls) == 1  # Second check came from the cache
+    # A different key is verified on its own
+    check("other")
+    assert len(calls) == 2
+    # An expired entry triggers a fresh request
+    check("key", ttl=0)
+    assert len(calls) == 3
+
+
+def test_verify_api_key_cached_survives_restart(monkeypatch, tmp_path: Path):
+    """A success saved to disk is reused after the in-memory cache is lost."""
+    cache = tmp_path / "key_cache.json"
+    calls = []
+
+    def fake_request(url, headers):
+        calls.append(url)
+        return types.SimpleNamespace(status_code=200)
+
+    monkeypatch.setattr(api_utils, "_verify_cache", {})
+    api_utils.verify_api_key_cached("sk-secret", request_fn=fake_request, cache_path=cache)
+    # The raw key must never be written to disk
+    assert "sk-secret" not in cache.read_text()
+
+    monkeypatch.setattr(api_utils, "_verify_cache", {})  # Simulate a new run
+    api_utils.verify_api_key_cached("sk-secret", request_fn=fake_request, cache_path=cache)
+    assert len(calls) == 1
+
+
+def test_verify_api_key_cached_does_not_cache_failures(monkeypatch, tmp_path: Path):
+    """Failed checks should hit the API again and clear any saved success."""
+    monkeypatch.setattr(api_utils, "_verify_cache", {})
+    cache = tmp_path / "key_cache.json"
+    status = {"code": 200}
+    calls = []
+
+    def request(url, headers):
+        calls.append(url)
+        resp = types.SimpleNamespace()
+        resp.status_code = status["code"]
+        resp.text = "unauthorized"
+        return resp
+
+    api_utils.verify_api_key_cached("key", request_fn=request, cache_path=cache)
+    status["code"] = 401  # The key gets revoked
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            api_utils.verify_api_key_cached(
+                "key", request_fn=request, cache_path=cache, ttl=0
+            )
+    assert len(calls) == 3
+    assert api_utils._load_key_cache(cache) == {}
+
+
+def test_load_key_cache_rejects_bad_contents(tmp_path: Path):
+    """Only a missing file counts as empty; corrupt or odd data raises."""
+    cache = tmp_path / "key_cache.json"
+    assert api_utils._load_key_cache(cache) == {}
+    cache.write_text("{not json")
+    with pytest.raises(ValueError):
+        api_utils._load_key_cache(cache)
+    # Valid JSON in the wrong shape is rejected too
+    for bad in ("[1, 2]", '{"abc": "yesterday"}'):
+        cache.write_text(bad)
+        with pytest.raises(ValueError):
+            api_utils._load_key_cache(cache)
+
+
+def test_verify_api_key_cached_reports_broken_cache(monkeypatch, tmp_path: Path, capsys):
+    """A corrupt or unwritable cache is printed and the key is checked live."""
+    monkeypatch.setattr(api_utils, "_verify_cache", {})
+    calls = []
+
+    def request(url, headers):
+        calls.append(url)
+        return types.SimpleNamespace(status_code=200)
+
+    corrupt = tmp_path / "key_cache.json"
+    corrupt.write_text("{not json")
+    assert api_utils.verify_api_key_cached("key", request_fn=request, cache_path=corrupt)
+    assert len(calls) == 1
+    assert "JSONDecodeError" in capsys.readouterr().err
+
+    # A directory in place of the file can be neither read nor written
+    monkeypatch.setattr(api_utils, "_verify_cache", {})
+    assert api_utils.verify_api_key_cached("key", request_fn=request, cache_path=tmp_path)
+    assert len(calls) == 2
+    assert "Error" in capsys.readouterr().err
+
+
 def test_extract_commit_id_found():
     """A commit hash embedded in the text should be returned."""
     text = "Some output\nCommitted abcdef1 add feature\n"
     assert git_utils.extract_commit_id(text) == "abcdef1"
 
 
+def test_extract_commit_id_accepts_short_form():
+    """Both "commit <hash>" and "Committed <hash>" should be recognized."""
+    assert git_utils.extract_commit_id("Created commit 1234abcd on main") == "1234abcd"
+
+
+def test_extract_commit_id_ignores_case():
+    """The substring prefilter must not hide upper-case commit lines."""
+    assert git_utils.extract_commit_id("COMMITTED ABCDEF1 done") == "ABCDEF1"
+
+
 def test_extract_commit_id_missing():
     """If no commit hash is present, None should be returned."""
     text = "Aider did nothing useful"
@@ -112,6 +254,51 @@ def test_needs_user_input_ignores_regular_output():
     assert not text_utils.needs_user_input(line)
 
 
+def test_needs_user_input_matches_each_pattern():
+    """Every individual pattern still triggers through the combined regex."""
+    lines = [
+        "Please confirm the file name?",
+        "You should ADD THE FILES TO THE CHAT first",
+        "I will stop here so you can review",
+        "Reply with answers to continue",
+    ]
+    for line in lines:
+        assert text_utils.needs_user_input(line)
+    # The "Please" question is anchored to the whole line
+    assert not text_utils.needs_user_input("I said Please help? then kept going")
+
+
+def test_has_line_markers_covers_every_line_check():
+    """Any line a source regex can match must also pass the prefilter."""
+    import re
+
+    # Sample lines for every regex the prefilter stands in front of
+    samples = {
+        git_utils.COMMIT_RE: [
+            "Committed abcdef1 add feature",
+            "Created commit 1234abcd on main",
+            "COMMIT ABCDEF1",
+        ],
+        text_utils.COST_RE: ["Cost: $0.50 message, $0.50 session.", "$3"],
+        text_utils.USER_INPUT_RE: [
+            "Please add README.md to the chat so I can edit it?",
+            "PLEASE confirm?",
+            "Add the files to the chat",
+            "I will stop here so you can add them to the chat",
+            "Reply with answers to continue",
+        ],
+    }
+    # Every user-input pattern needs a sample, so a new one can't slip past
+    for pat in text_utils.USER_INPUT_PATTERNS:
+        regex = re.compile(pat, re.IGNORECASE)
+        assert any(regex.search(line) for line in samples[text_utils.USER_INPUT_RE]), pat
+    for regex, lines in samples.items():
+        for line in lines:
+            assert regex.search(line), line  # The sample really is a match
+            assert text_utils.has_line_markers(line), line
+    assert not text_utils.has_line_markers("Aider v0.86.1")
+
+
 def test_load_and_save_working_dir(tmp_path: Path):
     """The last selected working directory should persist between runs."""
     cache = tmp_path / "dir.txt"
@@ -122,6 +309,64 @@ def test_load_and_save_working_dir(tmp_path: Path):
     assert config_utils.load_working_dir(cache) == "/path/to/dir"
 
 
+def test_save_working_dir_skips_unchanged_value(tmp_path: Path):
+    """Saving the directory that is already cached should not touch the file."""
+    import os
+
+    cache = tmp_path / "dir.txt"
+    config_utils.save_working_dir("/path/to/dir", cache)
+    # Backdate the file so any rewrite would be visible in its mtime
+    os.utime(cache, ns=(0, 0))
+    config_utils.save_working_dir("/path/to/dir", cache)
+    assert cache.stat().st_mtime_ns == 0
+    # A different directory is still written out
+    config_utils.save_working_dir("/other", cache)
+    assert config_utils.load_working_dir(cache) == "/other"
+
+
+def test_load_output_settings(tmp_path: Path):
+    """The [ui] section sets the output cap and wrap mode; bad values raise."""
+    cfg = tmp_path / "config.ini"
+    assert config_utils.load_output_max_lines(cfg) == 10000
+    assert config_utils.load_output_wrap(cfg) == "none"
+    cfg.write_text("[ui]\noutput_max_lines = 500\noutput_wrap = Word\n")
+    assert config_utils.load_output_max_lines(cfg) == 500
+    assert config_utils.load_output_wrap(cfg) == "word"
+    # Values Tk would reject are reported instead of silently replaced
+    cfg.write_text("[ui]\noutput_wrap = sideways\n")
+    with pytest.raises(ValueError):
+        config_utils.load_output_wrap(cfg)
+    # A cap that would delete everything on each insert is refused too
+    for bad in ("0", "-5", "lots"):
+        cfg.write_text(f"[ui]\noutput_max_lines = {bad}\n")
+        with pytest.raises(ValueError):
+            config_utils.load_output_max_lines(cfg)
+
+
+def test_load_usage_days_reuses_parsed_config(monkeypatch, tmp_path: Path):
+    """Unchanged config files are parsed once; edits are still picked up."""
+    cfg = tmp_path / "config.ini"
+    cfg.write_text("[api]\nusage_days = 7\n")
+    reads = []
+    original_read = config_utils.configparser.ConfigParser.read
+
+    def counting_read(self, *args, **kwargs):
+        # Record every disk parse so we can check the cache is used
+        reads.append(args)
+        return original_read(self, *args, **kwargs)
+
+    monkeypatch.setattr(config_utils.configparser.ConfigParser, "read", counting_read)
+
+    assert config_utils.load_usage_days(cfg) == 7
+    assert config_utils.load_usage_days(cfg) == 7
+    assert len(reads) == 1
+    # Changing the file invalidates the cached parser.
+    cfg.write_text("[api]\nusage_days = 14\n")
+    assert config_utils.load_usage_days(cfg) == 14
+    # A missing file falls back to the default window.
+    assert config_utils.load_usage_days(tmp_path / "missing.ini") == 30
+
+
 def test_model_selection_is_not_persisted(tmp_path: Path):
     """Saving the model should have no effect on subsequent loads."""
     cfg = tmp_path / "config.ini"
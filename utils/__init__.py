@@ -3,14 +3,23 @@
 The package is split into multiple modules to minimize merge conflicts,
 but common functions are re-exported here for backwards compatibility.
 """
-from .text import sanitize, should_suppress, extract_cost, needs_user_input
+from .text import (
+    sanitize,
+    should_suppress,
+    has_line_markers,
+    extract_cost,
+    needs_user_input,
+)
 from .git import (
     extract_commit_id,
     get_commit_stats,
     format_history_row,
     format_history_row_full,
     history_records_to_tsv,
+    append_history_record,
+    load_history_records,
     HISTORY_COL_WIDTHS,
+    HISTORY_PATH,
 )
 from .config import (
     load_default_model,
@@ -18,13 +27,16 @@ from .config import (
     load_working_dir,
     save_working_dir,
     load_usage_days,
+    load_output_max_lines,
+    load_output_wrap,
     build_and_launch_game,
 )
-from .api import verify_api_key, fetch_usage_data
+from .api import verify_api_key, verify_api_key_cached, fetch_usage_data
 
 __all__ = [
     "sanitize",
     "should_suppress",
+    "has_line_markers",
     "extract_cost",
     "needs_user_input",
     "extract_commit_id",
@@ -32,13 +44,19 @@ __all__ = [
     "format_history_row",
     "format_history_row_full",
     "history_records_to_tsv",
+    "append_history_record",
+    "load_history_records",
     "HISTORY_COL_WIDTHS",
+    "HISTORY_PATH",
     "load_default_model",
     "save_default_model",
     "load_working_dir",
     "save_working_dir",
     "load_usage_days",
+    "load_output_max_lines",
+    "load_output_wrap",
     "build_and_launch_game",
     "verify_api_key",
+    "verify_api_key_cached",
     "fetch_usage_data",
 ]
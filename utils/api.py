@@ -4,10 +4,27 @@ Network calls to services like OpenAI live in this module so they can be
 mocked cleanly during testing and kept separate from other utilities.
 """
 from datetime import date, timedelta  # Compute date ranges for API calls
-from typing import Callable
+import hashlib  # Fingerprint keys without keeping the raw secret around
+import json  # Persist key checks between runs
+import time
+import traceback  # Report cache problems without blocking the key check
+from pathlib import Path
+from typing import Callable, Dict, Optional
 
 import requests
 
+# How long, in seconds, a successful key check is trusted before asking the
+# API again. The result is saved to disk, so this also spans app restarts.
+VERIFY_CACHE_TTL = 3600
+
+# File remembering recent successful key checks between runs. Only key
+# fingerprints and timestamps are stored, never the key itself.
+KEY_CACHE_PATH = Path(__file__).with_name("api_key_cache.json")
+
+# Wall-clock time of the last successful check, keyed by a short fingerprint
+# of the API key so rotating the key forces a fresh check.
+_verify_cache: Dict[str, float] = {}
+
 
 def verify_api_key(api_key: str, request_fn: Callable = requests.get) -> bool:
     """Call OpenAI API to ensure the provided key is valid."""
@@ -26,6 +43,103 @@ def verify_api_key(api_key: str, request_fn: Callable = requests.get) -> bool:
     )
 
 
+def _key_fingerprint(api_key: str) -> str:
+    """Return a short SHA-256 prefix identifying ``api_key``."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def _load_key_cache(cache_path: Path) -> Dict[str, float]:
+    """Return saved check times from ``cache_path``.
+
+    A missing file just means nothing was saved yet. Unreadable files and
+    malformed contents raise so the caller can report them.
+    """
+    try:
+        text = cache_path.read_text()
+    except FileNotFoundError:
+        return {}
+    data = json.loads(text)
+    # Only a flat mapping of fingerprint -> numeric timestamp is valid
+    if not isinstance(data, dict) or not all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in data.values()
+    ):
+        raise ValueError(f"Malformed key cache: {cache_path}")
+    return {str(k): float(v) for k, v in data.items()}
+
+
+def _save_key_cache(entries: Dict[str, float], cache_path: Path) -> None:
+    """Write ``entries`` to ``cache_path``; errors propagate to the caller."""
+    cache_path.write_text(json.dumps(entries))
+
+
+def _update_key_cache(cache_path: Path, update: Callable[[Dict[str, float]], bool]) -> None:
+    """Load the cache, let ``update`` edit it, and save if it reports a change.
+
+    A broken cache file only costs a live check next time, so problems are
+    printed instead of failing the verification itself.
+    """
+    try:
+        saved = _load_key_cache(cache_path)
+        if update(saved):
+            _save_key_cache(saved, cache_path)
+    except (OSError, ValueError):
+        traceback.print_exc()
+
+
+def verify_api_key_cached(
+    api_key: str,
+    request_fn: Callable = requests.get,
+    ttl: float = VERIFY_CACHE_TTL,
+    cache_path: Optional[Path] = KEY_CACHE_PATH,
+) -> bool:
+    """Like :func:`verify_api_key`, but reuse a recent success for the same key.
+
+    Successes are remembered in memory and, unless ``cache_path`` is ``None``,
+    on disk so the next app start can skip the network call. A failure drops
+    the key's entry so the next check hits the API again.
+    """
+    if not api_key:
+        raise ValueError("API key not provided")
+
+    fingerprint = _key_fingerprint(api_key)
+    now = time.time()
+    checked_at = _verify_cache.get(fingerprint)
+    if checked_at is None and cache_path is not None:
+        try:
+            checked_at = _load_key_cache(cache_path).get(fingerprint)
+        except (OSError, ValueError):
+            # Report the bad file and fall back to asking the API
+            traceback.print_exc()
+    # A check time in the future means the clock moved back; don't trust it.
+    if checked_at is not None and 0 <= now - checked_at < ttl:
+        _verify_cache[fingerprint] = checked_at
+        return True
+
+    try:
+        verify_api_key(api_key, request_fn=request_fn)
+    except Exception:
+        _verify_cache.pop(fingerprint, None)
+        if cache_path is not None:
+            _update_key_cache(
+                cache_path, lambda saved: saved.pop(fingerprint, None) is not None
+            )
+        raise
+
+    _verify_cache[fingerprint] = now
+    if cache_path is not None:
+
+        def remember(saved: Dict[str, float]) -> bool:
+            # Drop expired entries while rewriting so the file stays tiny.
+            for k, t in list(saved.items()):
+                if not 0 <= now - t < ttl:
+                    del saved[k]
+            saved[fingerprint] = now
+            return True
+
+        _update_key_cache(cache_path, remember)
+    return True
+
+
 def fetch_usage_data(api_key: str, days: int = 30, request_fn: Callable = requests.get) -> dict:
     """Return spending and credit data from the OpenAI billing API."""
     headers = {"Authorization": f"Bearer {api_key}"}
@@ -9,7 +9,7 @@ import os
 import re  # Inspect Unity scripts for API patterns that need upgrades
 import configparser  # Read/write simple configuration values
 from pathlib import Path  # Locate config file relative to this module
-from typing import Optional, Union
+from typing import Dict, Optional, Tuple, Union
 import shutil  # Locate executables on the PATH
 import subprocess  # Run external commands like git or Unity
 from datetime import datetime  # Timestamp log entries for build attempts
@@ -24,6 +24,10 @@ CONFIG_PATH = Path(__file__).resolve().parents[1] / "config.ini"
 # config.ini as per project guidelines.
 WORKING_DIR_CACHE_PATH = Path(__file__).with_name("last_working_dir.txt")
 
+# Parsed config files keyed by path. Each entry stores the file's mtime and size
+# alongside the parser so repeated loads skip re-reading an unchanged file.
+_CONFIG_CACHE: Dict[Path, Tuple[Tuple[int, int], configparser.ConfigParser]] = {}
+
 # Snippet injected into legacy Unity scripts so they work with Unity 6.
 # The helper calls the new AssignDefaultActions() API and mirrors the old
 # LoadDefaultActions() behavior by returning the module's action asset.
@@ -127,6 +131,28 @@ def _log_builder_event(message: str, *, log_path: Path) -> None:
         return
 
 
+def _read_config(config_path: Path) -> configparser.ConfigParser:
+    """Return the parsed ``config_path``, reusing the cached parser if unchanged.
+
+    A missing file yields an empty parser so callers can rely on fallbacks.
+    """
+
+    try:
+        info = config_path.stat()
+    except OSError:
+        _CONFIG_CACHE.pop(config_path, None)
+        return configparser.ConfigParser()
+    # Edits on disk change the mtime or size, which invalidates the entry.
+    stamp = (info.st_mtime_ns, info.st_size)
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    _CONFIG_CACHE[config_path] = (stamp, config)
+    return config
+
+
 def load_default_model(config_path: Path = CONFIG_PATH) -> str:
     """Return the model to use on startup."""
     # Model selection is no longer persisted between sessions, so we always start
@@ -153,27 +179,54 @@ def load_working_dir(cache_path: Path = WORKING_DIR_CACHE_PATH) -> Optional[str]
 
 def save_working_dir(path: str, cache_path: Path = WORKING_DIR_CACHE_PATH) -> None:
     """Persist the selected working directory so it can be reloaded later."""
+    # Re-selecting the same folder should not rewrite the file.
+    if cache_path.exists() and cache_path.read_text() == path:
+        return
     with open(cache_path, "w") as fh:
         fh.write(path)
 
 
 def load_usage_days(config_path: Path = CONFIG_PATH) -> int:
     """Return how many days of API usage history to request."""
-    config = configparser.ConfigParser()
-    if config_path.exists():
-        config.read(config_path)
+    config = _read_config(config_path)
     return config.getint("api", "usage_days", fallback=30)
 
 
+def load_output_max_lines(config_path: Path = CONFIG_PATH) -> int:
+    """Return how many lines the output box keeps before trimming the oldest.
+
+    Raises ``ValueError`` unless the configured value is a positive integer.
+    """
+    config = _read_config(config_path)
+    max_lines = config.getint("ui", "output_max_lines", fallback=10000)
+    # A cap of zero or less would wipe the whole transcript on every insert.
+    if max_lines < 1:
+        raise ValueError(
+            f"[ui] output_max_lines must be at least 1, got {max_lines}"
+        )
+    return max_lines
+
+
+def load_output_wrap(config_path: Path = CONFIG_PATH) -> str:
+    """Return the output box wrap mode: ``none``, ``char`` or ``word``.
+
+    Raises ``ValueError`` for any other value.
+    """
+    config = _read_config(config_path)
+    wrap = config.get("ui", "output_wrap", fallback="none").strip().lower()
+    if wrap not in ("none", "char", "word"):
+        raise ValueError(
+            f"[ui] output_wrap must be none, char or word, got {wrap!r}"
+        )
+    return wrap
+
+
 def _find_unity_exe(config_path: Path = CONFIG_PATH) -> str:
     """Locate the Unity Editor executable using config, env var, or auto-search."""
-    cfg = configparser.ConfigParser()
-    build_cmd = None
-
-    # 1) Read build_cmd from the optional [build] section of config.ini
-    if config_path.exists():
-        cfg.read(config_path)
-        build_cmd = cfg.get("build", "build_cmd", fallback="").strip() or None
+    # 1) Read build_cmd from the optional [build] section of config.ini, sharing
+    # the cached parser with the other loaders.
+    cfg = _read_config(config_path)
+    build_cmd = cfg.get("build", "build_cmd", fallback="").strip() or None
 
     # 2) Fall back to UNITY_PATH environment variable
     build_cmd = build_cmd or os.environ.get("UNITY_PATH")
@@ -5,12 +5,20 @@ statistics, and format data for the history table in the UI. By keeping
 all git logic in one module we reduce the likelihood of merge
 conflicts elsewhere in the project.
 """
+import json  # Store history records one per line
 import re
 import subprocess
-from typing import Optional
+from pathlib import Path
+from typing import List, Optional
 
-# Regex used to detect commit hashes in aider output
-COMMIT_RE = re.compile(r"(?:Committed|commit) ([0-9a-f]{7,40})", re.IGNORECASE)
+# Regex used to detect commit hashes in aider output. Writing "commit" and
+# "committed" as one literal with an optional suffix lets the engine's literal
+# prefix search skip ahead instead of trying an alternation at every position.
+COMMIT_RE = re.compile(r"commit(?:ted)? ([0-9a-f]{7,40})", re.IGNORECASE)
+
+# File where request history is kept between runs. Like the working directory
+# cache it lives next to this module rather than in config.ini.
+HISTORY_PATH = Path(__file__).with_name("request_history.jsonl")
 
 # Default column widths for the history table. ID and count columns stay
 # compact while textual fields get extra room for readability.
@@ -137,3 +145,39 @@ def history_records_to_tsv(records: list[dict]) -> str:
     ]
     # Join all rows with newlines so multiple selections stack vertically.
     return "\n".join(rows)
+
+
+def append_history_record(record: dict, path: Path = HISTORY_PATH) -> None:
+    """Append ``record`` to the history file as a single JSON line.
+
+    Appending keeps each save proportional to one record no matter how long
+    the history grows.
+    """
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record) + "\n")
+
+
+def load_history_records(path: Path = HISTORY_PATH) -> List[dict]:
+    """Return every record saved in the history file, oldest first.
+
+    Raises ``ValueError`` naming the line if any record other than the last
+    one cannot be decoded.
+    """
+    if not path.exists():
+        return []
+    records = []
+    bad_line = None  # Number of an undecodable line seen so far
+    with open(path, encoding="utf-8") as fh:
+        for number, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            if bad_line is not None:
+                # A damaged record followed by more data is real corruption
+                raise ValueError(f"Corrupt history record on line {bad_line} of {path}")
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                bad_line = number
+    # A crash mid-write can leave a partial last line; dropping just that
+    # record keeps the rest of the history.
+    return records
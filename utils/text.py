@@ -8,14 +8,12 @@ codebase.
 import re
 from typing import Optional
 
-# Patterns to filter noisy warnings when no TTY is attached
-NO_TTY_PATTERNS = [
-    r"^Can't initialize prompt toolkit: No Windows console found",
-    r"^Terminal does not support pretty output",
-]
-
-# Compile regexes once at module import for efficiency
-NO_TTY_REGEXES = [re.compile(pat) for pat in NO_TTY_PATTERNS]
+# Line prefixes of noisy warnings printed when no TTY is attached. Both are
+# fixed text, so a tuple ``startswith`` check avoids the regex engine entirely.
+NO_TTY_PREFIXES = (
+    "Can't initialize prompt toolkit: No Windows console found",
+    "Terminal does not support pretty output",
+)
 
 # Regexes used to detect when aider is asking for additional input from the user.
 # Besides direct questions, aider will often pause and ask the user to add files
@@ -27,31 +25,59 @@ USER_INPUT_PATTERNS = [
     r"stop here so you can",       # Indicates aider paused for user action
     r"reply with answers",         # Explicit instruction to respond with text
 ]
-# Compile regexes with IGNORECASE so minor variations are still caught
-USER_INPUT_REGEXES = [re.compile(pat, re.IGNORECASE) for pat in USER_INPUT_PATTERNS]
+# Join the patterns into one alternation so each line is scanned by a single
+# regex search instead of one per pattern. IGNORECASE keeps minor variations
+# matching.
+USER_INPUT_RE = re.compile(
+    "|".join(f"(?:{pat})" for pat in USER_INPUT_PATTERNS), re.IGNORECASE
+)
+
+# Cheap prefilter for the per-line checks in ``run_aider``. A line can only
+# hold a commit id, a cost or a request for user input if it contains one of
+# these markers, so most output is rejected after a single scan. Keep this in
+# sync with ``USER_INPUT_PATTERNS``, ``COST_RE`` and ``utils.git.COMMIT_RE``.
+LINE_MARKERS_RE = re.compile(r"commit|\$|please|chat|stop here|reply", re.IGNORECASE)
 
 # Regex used to extract dollar amounts from aider output
 COST_RE = re.compile(r"\$([0-9]+(?:\.[0-9]+)?)")
 
+# Translation table used by ``sanitize``: newlines become spaces so everything
+# fits on one line, and quotes are dropped because they might break shell
+# commands. One ``translate`` pass replaces four chained ``replace`` calls.
+SANITIZE_TABLE = str.maketrans({"\n": " ", "\r": " ", '"': None, "'": None})
+
 # Regex to match ANSI escape sequences like ``\x1b[31m`` which colorize terminal output
 ANSI_RE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
 
 
 def sanitize(text: str) -> str:
     """Remove newlines and quotes, and collapse whitespace to single spaces."""
-    # Replace newlines with spaces so everything fits on one line
-    text = text.replace("\n", " ").replace("\r", " ")
-    # Strip out all quote characters which might break shell commands
-    text = text.replace('"', '').replace("'", "")
-    # Collapse any run of whitespace into a single space and trim
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    # Typical one-line prompts are already clean. ``isprintable`` rules out
+    # every whitespace character except the plain space, so if there are also
+    # no quotes or double spaces the trimmed text is the final result.
+    stripped = text.strip()
+    if (
+        stripped.isprintable()
+        and "  " not in stripped
+        and '"' not in stripped
+        and "'" not in stripped
+    ):
+        return stripped
+    # Swap newlines for spaces and drop quotes in a single pass, then let
+    # ``split`` drop leading/trailing whitespace and break on every run of it
+    # so ``join`` can rebuild the text with single spaces.
+    return " ".join(text.translate(SANITIZE_TABLE).split())
 
 
 def should_suppress(line: str) -> bool:
     """Return True if the line matches known warnings to suppress."""
-    # Check each compiled regex to see if the line is a noisy warning
-    return any(rx.search(line) for rx in NO_TTY_REGEXES)
+    # One C-level prefix comparison covers every known warning
+    return line.startswith(NO_TTY_PREFIXES)
+
+
+def has_line_markers(line: str) -> bool:
+    """Return True if the line might contain a commit, cost or user prompt."""
+    return LINE_MARKERS_RE.search(line) is not None
 
 
 def extract_cost(text: str) -> Optional[float]:
@@ -66,7 +92,7 @@ def needs_user_input(line: str) -> bool:
     # Trim whitespace so leading/trailing spaces don't interfere with detection
     stripped = line.strip()
     # Search anywhere in the line for patterns that imply the user must respond
-    return any(rx.search(stripped) for rx in USER_INPUT_REGEXES)
+    return USER_INPUT_RE.search(stripped) is not None
 
 
 def strip_ansi(text: str) -> str: